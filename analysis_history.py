@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Analysis History
+Keeps the most recent analyses in a fixed-size ring buffer and, optionally,
+every analysis in an append-only SQLite log indexed by timestamp and
+sentiment label. Long sessions stay at a constant memory footprint while the
+full history can still be queried and exported as a stream.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Rows fetched per round trip when streaming from the log
+_FETCH_SIZE = 500
+
+def entry_label(results):
+    """Overall sentiment label of a GUI result: VADER's if run, else TextBlob's"""
+    for method in ("VADER", "TextBlob"):
+        if method in results:
+            return results[method]["sentiment"]
+    return None
+
+def engine_results(results):
+    """(method, results) of a GUI result in the analyze_text layout used by result_exporters"""
+    converted = {}
+    vader = results.get("VADER")
+    if vader is not None:
+        scores = vader["scores"]
+        converted['vader'] = {
+            'sentiment': vader["sentiment"],
+            'compound': scores['compound'],
+            'positive': scores['pos'],
+            'neutral': scores['neu'],
+            'negative': scores['neg']
+        }
+    textblob = results.get("TextBlob")
+    if textblob is not None:
+        converted['textblob'] = {key: textblob[key] for key in ('sentiment', 'polarity', 'subjectivity')}
+    converted['emotions'] = results.get("Emotions") or {}
+    if "Statistics" in results:
+        converted['statistics'] = results["Statistics"]
+    method = 'both' if vader is not None and textblob is not None else 'vader' if vader is not None else 'textblob'
+    return method, converted
+
+class AnalysisHistory:
+    """Ring buffer of recent analyses with an optional SQLite log.
+
+    Entries are dicts with 'timestamp' ("YYYY-MM-DD HH:MM:SS", so they sort
+    as text), 'label', 'text' and 'results'. Only the last ``max_entries``
+    are held in memory; with ``db_path`` every entry is also appended to the
+    log, which ``iter_entries`` and ``export`` read without loading it whole.
+    """
+
+    def __init__(self, max_entries=100, db_path=None, commit_every=1):
+        self.entries = deque(maxlen=max_entries)
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    label TEXT,
+                    text TEXT NOT NULL,
+                    results TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+                CREATE INDEX IF NOT EXISTS history_label ON history (label, timestamp);
+            """)
+            self._db.commit()
+
+    def add(self, text, results, timestamp=None):
+        """Record one analysis and return the stored entry"""
+        entry = {
+            "timestamp": timestamp or time.strftime("%Y-%m-%d %H:%M:%S"),
+            "label": entry_label(results),
+            "text": text,
+            "results": results
+        }
+        with self._lock:
+            self.entries.append(entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT INTO history (timestamp, label, text, results) VALUES (?, ?, ?, ?)",
+                    (entry["timestamp"], entry["label"], text, json.dumps(results))
+                )
+                self._uncommitted += 1
+                if self._uncommitted >= self.commit_every:
+                    self._db.commit()
+                    self._uncommitted = 0
+        return entry
+
+    def __len__(self):
+        """Number of analyses in the log (or in memory without one)"""
+        with self._lock:
+            if self._db is None:
+                return len(self.entries)
+            return self._db.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def recent(self, count=None):
+        """The latest in-memory entries, oldest first"""
+        with self._lock:
+            entries = list(self.entries)
+        return entries if count is None else entries[-count:]
+
+    def iter_entries(self, since=None, until=None, label=None):
+        """Yield entries oldest first, optionally filtered by timestamp range and label.
+
+        With a log the entries are read in batches, so any number of them can
+        be streamed; without one only the in-memory entries are available.
+        """
+        if self._db is None:
+            for entry in self.recent():
+                if since is not None and entry["timestamp"] < since:
+                    continue
+                if until is not None and entry["timestamp"] > until:
+                    continue
+                if label is not None and entry["label"] != label:
+                    continue
+                yield entry
+            return
+
+        conditions, params = [], []
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+        if label is not None:
+            conditions.append("label = ?")
+            params.append(label)
+
+        self.flush()
+        last = None
+        while True:
+            # Keyset pagination: each batch is a short indexed query, and the
+            # lock is never held while the caller consumes entries
+            page_conditions, page_params = list(conditions), list(params)
+            if last is not None:
+                page_conditions.append("(timestamp > ? OR (timestamp = ? AND id > ?))")
+                page_params += [last[1], last[1], last[0]]
+            where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, timestamp, label, text, results FROM history{where} "
+                    f"ORDER BY timestamp, id LIMIT ?", page_params + [_FETCH_SIZE]
+                ).fetchall()
+            for _, timestamp, row_label, text, results in rows:
+                yield {"timestamp": timestamp, "label": row_label, "text": text,
+                       "results": json.loads(results)}
+            if len(rows) < _FETCH_SIZE:
+                return
+            last = rows[-1][:2]
+
+    def export(self, path, **filters):
+        """Write entries (see iter_entries for filters) as a text report, returning the count"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("SENTIMENT ANALYSIS RESULTS\n")
+            f.write("=" * 50 + "\n\n")
+            for entry in self.iter_entries(**filters):
+                f.write(format_entry(entry))
+                count += 1
+        return count
+
+    def export_to(self, exporter, **filters):
+        """Stream entries into a result_exporters exporter (ids are timestamps), returning the count"""
+        count = 0
+        for entry in self.iter_entries(**filters):
+            method, results = engine_results(entry["results"])
+            exporter.write(entry["timestamp"], entry["text"], method, results)
+            count += 1
+        return count
+
+    def flush(self):
+        """Commit pending writes to the log"""
+        with self._lock:
+            if self._db is not None and self._uncommitted:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def close(self):
+        """Flush and close the log"""
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+def format_entry(entry):
+    """One history entry in the text export format"""
+    lines = [f"Timestamp: {entry['timestamp']}", f"Text: {entry['text']}", "-" * 30]
+    for method, data in entry['results'].items():
+        lines.append(f"{method}:")
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if isinstance(value, float):
+                    lines.append(f"  {key}: {value:.3f}")
+                else:
+                    lines.append(f"  {key}: {value}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Analyzer Snapshot
+Warm-start file for short-lived processes. Building the analyzers parses the
+VADER lexicon and TextBlob's sentiment XML (or the fast backends' tables) on
+every start; a snapshot stores the loaded state of the engine's backends in
+one pickle, so later starts restore it instead.
+
+A snapshot is only used when its key matches: the snapshot format, the
+Python version, the backend choices, and the size and mtime of the lexicon
+data files and of the library and local modules that define the pickled
+state. Those change whenever a library is upgraded, and checking them costs
+a few stat calls, without importing anything. Otherwise the snapshot is
+rebuilt. Snapshots are pickles, so only load ones this tool wrote.
+
+    python cli_sentiment_analysis.py --snapshot ~/.cache/sentiment.snapshot "Great service!"
+"""
+
+import gc
+import os
+import pickle
+import platform
+import struct
+import sys
+from importlib.util import find_spec
+
+MAGIC = b'SASNAP\x00\x01'
+
+# Bump when the layout of the stored state changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Lexicon data files and modules behind the pickled state, by library package
+_LIBRARY_FILES = {
+    'vaderSentiment': ('vader_lexicon.txt', 'emoji_utf8_lexicon.txt', 'vaderSentiment.py'),
+    'textblob': (os.path.join('en', 'en-sentiment.xml'), os.path.join('en', '__init__.py'), '_text.py')
+}
+
+# Local modules whose classes or data are pickled in a snapshot
+_STATE_MODULES = ('sentiment_engine', 'fast_vader', 'fast_textblob', 'compiled_lexicon')
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _source_files():
+    """Lexicon data files and state-defining modules, found without importing them"""
+    files = []
+    for package, names in _LIBRARY_FILES.items():
+        spec = find_spec(package)
+        if spec is not None:
+            directory = list(spec.submodule_search_locations)[0]
+            files += [os.path.join(directory, name) for name in names]
+    for module in _STATE_MODULES:
+        spec = find_spec(module)
+        if spec is not None and spec.origin:
+            files.append(spec.origin)
+    return files
+
+def snapshot_key(engine):
+    """What a snapshot of ``engine`` depends on; a stored snapshot is used only if its key is equal"""
+    lexicon_file = engine.lexicon_file
+    return {
+        'format': SNAPSHOT_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'vader_backend': engine.vader_backend,
+        'textblob_backend': engine.textblob_backend,
+        'lexicon_file': [lexicon_file.path, _file_stamp(lexicon_file.path)] if lexicon_file is not None else None,
+        'sources': {path: _file_stamp(path) for path in _source_files()}
+    }
+
+def save_snapshot(path, engine):
+    """Load the engine's backends (if not done yet) and write their state to ``path``"""
+    key = pickle.dumps(snapshot_key(engine), protocol=pickle.HIGHEST_PROTOCOL)
+    state = pickle.dumps(engine.get_state(), protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(key)))
+        f.write(key)
+        f.write(state)
+    # Concurrent writers each replace the file whole, so readers never see a partial one
+    os.replace(temporary, path)
+
+def load_snapshot(path, engine):
+    """Restore the engine's backends from ``path``; False if it is missing, unreadable or stale"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return False
+            key_length = struct.unpack('<Q', f.read(8))[0]
+            if pickle.loads(f.read(key_length)) != snapshot_key(engine):
+                return False
+            data = f.read()
+        # Unpickling allocates many small objects; the collections that would
+        # trigger scan the whole heap and cost several times the load itself
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            state = pickle.loads(data)
+        finally:
+            if collecting:
+                gc.enable()
+    except (OSError, EOFError, struct.error, pickle.UnpicklingError, AttributeError, ImportError):
+        return False
+    engine.set_state(state)
+    return True
+
+def warm_start(engine, path):
+    """Restore ``engine`` from the snapshot at ``path``, or build it and write the snapshot.
+
+    Returns 'loaded' or 'saved' ('unsaved' if the snapshot could not be written).
+    """
+    if load_snapshot(path, engine):
+        return 'loaded'
+    try:
+        save_snapshot(path, engine)
+    except OSError as e:
+        print(f"Warning: could not write snapshot {path}: {e}", file=sys.stderr)
+        return 'unsaved'
+    return 'saved'
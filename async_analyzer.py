@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Async Sentiment Analyzer
+asyncio front-end for embedding the analyzer in event-loop services. Calls
+never run analysis on the event loop: requests are queued, grouped into
+micro-batches and analyzed on a managed worker pool, one executor round trip
+per batch rather than per text. The queue is bounded, so producers that
+outrun the workers wait instead of piling up memory.
+
+    async with AsyncSentimentAnalyzer(workers=4) as analyzer:
+        result = await analyzer.analyze("Great service!")
+        async for result in analyzer.analyze_stream(texts):
+            ...
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cli_sentiment_analysis as cli
+
+class AsyncSentimentAnalyzer:
+    """Micro-batching asyncio wrapper around CLISentimentAnalyzer.
+
+    ``executor='process'`` (default) runs a ProcessPoolExecutor of ``workers``
+    warm analyzers; ``'thread'`` runs them on threads, which keeps the loop
+    responsive without extra processes but shares one CPU core. A batch is
+    dispatched as soon as ``max_batch_size`` requests are waiting, otherwise
+    after ``max_batch_delay`` seconds. At most two batches per worker are in
+    flight and at most ``max_queue`` requests wait, so ``analyze`` applies
+    backpressure to its callers.
+    """
+
+    def __init__(self, method='both', workers=None, executor='process', max_batch_size=32,
+                 max_batch_delay=0.002, max_queue=1024, emotion_lexicon=None,
+                 vader_backend='reference', textblob_backend='reference', lexicon_file=None):
+        if executor not in ('process', 'thread'):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.method = method
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_queue = max_queue
+        self.emotion_lexicon = emotion_lexicon
+        self.vader_backend = vader_backend
+        self.textblob_backend = textblob_backend
+        # Compiled lexicon file every worker maps (see compiled_lexicon)
+        self.lexicon_file = lexicon_file
+        self.executor = None
+        self.batches = 0
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._running = set()
+
+    async def start(self):
+        """Start the worker pool and the batcher (called on first use if not called)"""
+        if self._batcher is not None:
+            return
+        initargs = (self.emotion_lexicon, self.vader_backend, self.textblob_backend, self.lexicon_file)
+        if self.executor_kind == 'process':
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                initializer=cli._init_worker, initargs=initargs)
+        else:
+            # Each worker thread builds its own analyzer
+            self.executor = ThreadPoolExecutor(max_workers=self.workers,
+                                               initializer=_init_thread_worker, initargs=initargs)
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+        # Warm every worker so the first requests don't pay for it
+        loop = asyncio.get_running_loop()
+        chunk_function = self._chunk_function()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, chunk_function, ['warm up'], self.method)
+            for _ in range(self.workers)
+        ])
+
+    async def close(self):
+        """Finish queued requests, then shut the worker pool down"""
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._batcher = None
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def analyze(self, text, method=None, by_sentence=False):
+        """Analyze one text; concurrent calls are batched together"""
+        future = await self._submit(text, method, by_sentence)
+        return await future
+
+    async def analyze_stream(self, texts, method=None, by_sentence=False, max_pending=None):
+        """Yield results for a sync or async iterable of texts, in input order.
+
+        At most ``max_pending`` texts (default: enough to keep every worker
+        busy) are submitted ahead of the result being yielded.
+        """
+        max_pending = max_pending or self.max_batch_size * self.workers * 2
+        pending = deque()
+        try:
+            if hasattr(texts, '__aiter__'):
+                async for text in texts:
+                    pending.append(await self._submit(text, method, by_sentence))
+                    if len(pending) >= max_pending:
+                        yield await pending.popleft()
+            else:
+                for text in texts:
+                    pending.append(await self._submit(text, method, by_sentence))
+                    if len(pending) >= max_pending:
+                        yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # A consumer that stops early drops the results it no longer wants
+            for future in pending:
+                future.cancel()
+
+    async def _submit(self, text, method, by_sentence):
+        """Queue a request, waiting while the queue is full; returns its future"""
+        if self._batcher is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, method or self.method, by_sentence, future))
+        return future
+
+    async def _run_batcher(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self.max_batch_delay and queue.qsize() < self.max_batch_size - 1:
+                # Give concurrent callers a moment to join this batch
+                await asyncio.sleep(self.max_batch_delay)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch):
+        """Analyze a batch, one executor call per (method, by_sentence) group"""
+        loop = asyncio.get_running_loop()
+        chunk_function = self._chunk_function()
+        try:
+            groups = {}
+            for request in batch:
+                if not request[3].cancelled():
+                    groups.setdefault((request[1], request[2]), []).append(request)
+            for (method, by_sentence), requests in groups.items():
+                try:
+                    results = await loop.run_in_executor(
+                        self.executor, chunk_function, [request[0] for request in requests],
+                        method, by_sentence
+                    )
+                except Exception as e:
+                    for request in requests:
+                        if not request[3].done():
+                            request[3].set_exception(e)
+                    continue
+                for request, result in zip(requests, results):
+                    if not request[3].done():
+                        request[3].set_result(result)
+            self.batches += 1
+        finally:
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+
+    def _chunk_function(self):
+        return cli._analyze_chunk if self.executor_kind == 'process' else _analyze_thread_chunk
+
+# One analyzer per worker thread for executor='thread'
+_thread_state = threading.local()
+
+def _init_thread_worker(emotion_lexicon=None, vader_backend='reference', textblob_backend='reference',
+                        lexicon_file=None):
+    _thread_state.analyzer = cli.CLISentimentAnalyzer(emotion_lexicon=emotion_lexicon,
+                                                      vader_backend=vader_backend,
+                                                      textblob_backend=textblob_backend,
+                                                      lexicon_file=lexicon_file)
+
+def _analyze_thread_chunk(texts, method, by_sentence=False):
+    analyzer = _thread_state.analyzer
+    return [analyzer.analyze_text(text, method=method, by_sentence=by_sentence) for text in texts]
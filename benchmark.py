@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite for the Sentiment Analysis Tool
+Times the analysis pipeline per stage (preprocessing, VADER, TextBlob,
+emotions, statistics) and per method end to end, over synthetic texts or the
+samples in sample_texts.txt, and writes machine-readable results so releases
+can be compared.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from multiprocessing import get_context
+
+from cascade_scoring import TIERS, Cascade
+from cli_sentiment_analysis import CLISentimentAnalyzer, VADER_BACKENDS, TEXTBLOB_BACKENDS
+from text_preprocessing import prepare_text
+
+SAMPLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_texts.txt')
+
+STAGES = ['preprocess', 'vader', 'textblob', 'emotions', 'statistics']
+METHODS = ['vader', 'textblob', 'both']
+
+# Vocabulary for synthetic texts: mostly neutral words with some sentiment
+# and emotion keywords mixed in, roughly like real reviews
+_NEUTRAL_WORDS = (
+    "the a product order delivery service team phone battery screen price store "
+    "week day app update support call email package box quality size color time "
+    "was is it this that and but with for after before on in to of we they i"
+).split()
+_SENTIMENT_WORDS = (
+    "good great love amazing happy excellent nice wonderful fantastic like "
+    "bad terrible awful hate horrible disappointed sad angry worried broken slow "
+    "wow incredible shocked not very really never"
+).split()
+
+def synthetic_corpus(count, length, seed=0):
+    """Generate ``count`` texts of about ``length`` words each"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        for i in range(length):
+            pool = _SENTIMENT_WORDS if rng.random() < 0.15 else _NEUTRAL_WORDS
+            words.append(rng.choice(pool))
+            if i % 12 == 11:
+                words[-1] += rng.choice(['.', '!', '.'])
+        text = ' '.join(words)
+        texts.append(text[0].upper() + text[1:] + '.')
+    return texts
+
+def load_sample_texts(path=SAMPLE_FILE):
+    """Return the long sample texts from sample_texts.txt"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') for line in f]
+    samples = []
+    for i in range(1, len(lines) - 1):
+        # Each sample is the line following a dashed underline
+        if lines[i] and set(lines[i]) == {'-'} and lines[i + 1].strip():
+            samples.append(lines[i + 1].strip())
+    return samples
+
+def samples_corpus(count, length=0):
+    """``count`` texts cycled from sample_texts.txt, cut to ``length`` words if non-zero"""
+    samples = load_sample_texts()
+    if length:
+        samples = [' '.join(sample.split()[:length]) for sample in samples]
+    return [samples[i % len(samples)] for i in range(count)]
+
+def file_corpus(path, count, length=0):
+    """Up to ``count`` non-empty lines from a file, cut to ``length`` words if non-zero"""
+    texts = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                texts.append(' '.join(line.split()[:length]) if length else line)
+                if len(texts) >= count:
+                    break
+    return texts
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _stage_callable(analyzer, stage):
+    """Return a function running one pipeline stage on a text"""
+    if stage == 'preprocess':
+        return prepare_text
+    engine = analyzer.engine
+    if stage in ('vader', 'textblob'):
+        return lambda text: engine.score(stage, text)
+    if stage in ('emotions', 'statistics'):
+        return lambda text: engine.score(stage, text, prepare_text(text))
+    raise ValueError(f"Unknown stage: {stage}")
+
+def _time_calls(func, texts, warmup):
+    """Run ``func`` over texts, returning per-call latencies in seconds and the total"""
+    for text in texts[:warmup]:
+        func(text)
+    latencies = []
+    perf_counter = time.perf_counter
+    start = perf_counter()
+    for text in texts:
+        t0 = perf_counter()
+        func(text)
+        latencies.append(perf_counter() - t0)
+    return latencies, perf_counter() - start
+
+def run_case(kind, name, texts, warmup=5, vader_backend='reference', textblob_backend='reference'):
+    """Benchmark one stage or method and summarize the timings.
+
+    Emotions and statistics include their share of preprocessing, since
+    that is what they cost when run on their own.
+    """
+    cascade = Cascade() if name == 'cascade' else None
+    analyzer = CLISentimentAnalyzer(vader_backend=vader_backend, textblob_backend=textblob_backend,
+                                    cascade=cascade)
+    if kind == 'stage':
+        func = _stage_callable(analyzer, name)
+    else:
+        func = lambda text: analyzer.analyze_text(text, method=name)
+    if cascade is not None:
+        # Warm-up texts may never escalate, which would leave the later
+        # tiers' lazy loading inside the timed loop
+        for tier in cascade.tiers:
+            TIERS[tier](analyzer, 'Warm up.', {})
+
+    latencies, total = _time_calls(func, texts, warmup)
+    latencies.sort()
+    return {
+        'kind': kind,
+        'name': name,
+        'docs': len(texts),
+        'total_seconds': total,
+        'docs_per_second': len(texts) / total if total else 0.0,
+        'mean_ms': 1000 * total / len(texts) if texts else 0.0,
+        'p50_ms': 1000 * _percentile(latencies, 0.50),
+        'p99_ms': 1000 * _percentile(latencies, 0.99),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def run_benchmark(texts, stages=STAGES, methods=METHODS, isolate=True, warmup=5, progress=None,
+                  vader_backend='reference', textblob_backend='reference'):
+    """Run every requested stage and method over ``texts``.
+
+    With ``isolate`` each case runs in a fresh process, so its peak RSS is
+    its own rather than the high-water mark of everything before it.
+    """
+    cases = [('stage', stage) for stage in stages] + [('method', method) for method in methods]
+    results = []
+    if isolate:
+        context = get_context('spawn')
+        for kind, name in cases:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(run_case, (kind, name, texts, warmup, vader_backend,
+                                                     textblob_backend)))
+            if progress:
+                progress(results[-1])
+    else:
+        for kind, name in cases:
+            results.append(run_case(kind, name, texts, warmup, vader_backend, textblob_backend))
+            if progress:
+                progress(results[-1])
+    return results
+
+def _library_versions():
+    """Versions of the analysis libraries, for comparing runs"""
+    from importlib import metadata
+    versions = {}
+    for distribution in ('vaderSentiment', 'textblob', 'nltk'):
+        try:
+            versions[distribution] = metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            versions[distribution] = None
+    return versions
+
+def print_case(case):
+    """Print one benchmark row"""
+    rss = f"{case['peak_rss_mb']:8.1f}" if case['peak_rss_mb'] is not None else "     n/a"
+    print(f"  {case['kind']:<7}{case['name']:<12}{case['docs_per_second']:>12.1f}"
+          f"{case['p50_ms']:>10.3f}{case['p99_ms']:>10.3f}{rss}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sentiment analysis pipeline per stage and per method",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark.py
+  python benchmark.py --corpus samples --docs 200 --output bench.json
+  python benchmark.py --corpus synthetic --docs 5000 --length 25 --methods vader
+  python benchmark.py --stages vader --methods none --vader-backend fast
+  python benchmark.py --stages textblob --methods textblob --textblob-backend fast
+  python cli_sentiment_analysis.py benchmark --corpus reviews.txt --docs 1000
+        """
+    )
+    parser.add_argument('--corpus', default='synthetic',
+                        help="'synthetic', 'samples' (sample_texts.txt) or a file with one text per line")
+    parser.add_argument('--docs', type=int, default=500, help='Number of texts (default: 500)')
+    parser.add_argument('--length', type=int, default=40,
+                        help='Words per text; for samples and files 0 keeps full texts (default: 40)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to time, or 'none' (default: {','.join(STAGES)})")
+    parser.add_argument('--methods', default=','.join(METHODS),
+                        help=f"Comma-separated methods to time end to end (also: cascade), "
+                             f"or 'none' (default: {','.join(METHODS)})")
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed warm-up calls per case (default: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for synthetic texts (default: 0)')
+    parser.add_argument('--vader-backend', choices=VADER_BACKENDS, default='reference',
+                        help='VADER implementation to time (default: reference)')
+    parser.add_argument('--textblob-backend', choices=TEXTBLOB_BACKENDS, default='reference',
+                        help='TextBlob implementation to time (default: reference)')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='Run all cases in this process (faster, but peak RSS is cumulative)')
+    parser.add_argument('--output', '-o', help='Write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    def parse_list(value, allowed):
+        if value == 'none':
+            return []
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            parser.error(f"unknown name(s): {', '.join(unknown)} (choose from {', '.join(allowed)})")
+        return names
+
+    stages = parse_list(args.stages, STAGES)
+    methods = parse_list(args.methods, METHODS + ['cascade'])
+
+    if args.corpus == 'synthetic':
+        texts = synthetic_corpus(args.docs, args.length, args.seed)
+    elif args.corpus == 'samples':
+        texts = samples_corpus(args.docs, args.length)
+    else:
+        texts = file_corpus(args.corpus, args.docs, args.length)
+    if not texts:
+        parser.error('the corpus is empty')
+
+    avg_words = sum(len(text.split()) for text in texts) / len(texts)
+    print(f"Benchmarking {len(texts)} texts from '{args.corpus}' (avg {avg_words:.0f} words)")
+    print(f"  {'kind':<7}{'name':<12}{'docs/sec':>12}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>8}")
+
+    results = run_benchmark(texts, stages, methods, isolate=not args.no_isolate,
+                            warmup=args.warmup, progress=print_case, vader_backend=args.vader_backend,
+                            textblob_backend=args.textblob_backend)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'corpus': args.corpus,
+        'docs': len(texts),
+        'avg_words': avg_words,
+        'isolated': not args.no_isolate,
+        'vader_backend': args.vader_backend,
+        'textblob_backend': args.textblob_backend,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'libraries': _library_versions(),
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    return report
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Cascade Scoring
+Tiered sentiment scoring for labeling. The cheapest tier runs first and the
+next tier only runs when the cascade's policy finds the label so far not
+good enough, so the cost of a corpus grows with how many of its texts are
+ambiguous rather than with its size. Each result records the tiers that
+ran and the final label; emotions and statistics are only added on request.
+
+    python cli_sentiment_analysis.py --batch reviews.txt --method cascade --vader-backend fast
+    python cli_sentiment_analysis.py --batch reviews.txt --method cascade \\
+        --cascade-policy disagree --cascade-tiers vader,textblob,sentences
+"""
+
+from sentiment_engine import VADER_NEGATIVE_THRESHOLD, VADER_POSITIVE_THRESHOLD
+
+DEFAULT_TIERS = ('vader', 'textblob')
+
+# Distance from a label threshold within which a score counts as ambiguous:
+# VADER compounds within it of the +/-0.05 thresholds (the neutral band
+# included), TextBlob polarities within it of 0
+DEFAULT_MARGIN = 0.1
+
+def _vader_tier(analyzer, text, results):
+    results['vader'] = analyzer._run_stage('vader', analyzer.engine.score, 'vader', text)
+
+def _textblob_tier(analyzer, text, results):
+    results['textblob'] = analyzer._run_stage('textblob', analyzer.engine.score, 'textblob', text)
+
+def _sentences_tier(analyzer, text, results):
+    # Per-sentence VADER and TextBlob, aggregated as with --sentences; the
+    # most expensive tier, for mixed texts the whole-text scores disagree on
+    scored = analyzer._analyze_by_sentence(text, 'both', extras=())
+    for key in ('vader', 'textblob', 'sentences'):
+        results[key] = scored[key]
+
+# Tier functions by name: each adds its sections to the results
+TIERS = {
+    'vader': _vader_tier,
+    'textblob': _textblob_tier,
+    'sentences': _sentences_tier
+}
+
+def tier_label(tier, results):
+    """Label given by a tier that ran (the VADER label for per-sentence scores)"""
+    return results['textblob' if tier == 'textblob' else 'vader']['sentiment']
+
+def is_ambiguous(tier, results, margin=DEFAULT_MARGIN):
+    """Whether a tier's score lies within ``margin`` of a label threshold"""
+    if tier == 'textblob':
+        return abs(results['textblob']['polarity']) < margin
+    compound = results['vader']['compound']
+    return VADER_NEGATIVE_THRESHOLD - margin < compound < VADER_POSITIVE_THRESHOLD + margin
+
+class CascadePolicy:
+    """Decides after each tier whether to run the next one"""
+
+    def __init__(self, margin=DEFAULT_MARGIN):
+        self.margin = margin
+
+    def escalate(self, tiers_run, results):
+        raise NotImplementedError
+
+class AmbiguousPolicy(CascadePolicy):
+    """Escalate while the last tier's score is ambiguous"""
+
+    def escalate(self, tiers_run, results):
+        return is_ambiguous(tiers_run[-1], results, self.margin)
+
+class DisagreePolicy(AmbiguousPolicy):
+    """Escalate while the last score is ambiguous or the tiers so far disagree on the label"""
+
+    def escalate(self, tiers_run, results):
+        if len({tier_label(tier, results) for tier in tiers_run}) > 1:
+            return True
+        return super().escalate(tiers_run, results)
+
+class AlwaysPolicy(CascadePolicy):
+    """Run every tier; the baseline for measuring what a cascade saves"""
+
+    def escalate(self, tiers_run, results):
+        return True
+
+# Policy classes by name; add an entry to support another policy
+CASCADE_POLICIES = {
+    'ambiguous': AmbiguousPolicy,
+    'disagree': DisagreePolicy,
+    'always': AlwaysPolicy
+}
+
+class Cascade:
+    """An ordered list of TIERS and the policy deciding when to go past each"""
+
+    def __init__(self, policy='ambiguous', tiers=DEFAULT_TIERS, margin=DEFAULT_MARGIN):
+        if policy not in CASCADE_POLICIES:
+            raise ValueError(f"Unknown cascade policy: {policy}")
+        tiers = tuple(tiers)
+        unknown = [tier for tier in tiers if tier not in TIERS]
+        if unknown or not tiers:
+            raise ValueError(f"Cascade tiers must be some of: {', '.join(TIERS)}")
+        self.policy_name = policy
+        self.policy = CASCADE_POLICIES[policy](margin)
+        self.tiers = tiers
+        self.margin = margin
+
+    def key(self):
+        """Configuration string, e.g. for cache keys"""
+        return f"{self.policy_name}:{','.join(self.tiers)}:{self.margin}"
+
+    def analyze(self, analyzer, text):
+        """Run the tiers on a text with a CLISentimentAnalyzer, returning the sentiment sections
+        plus a 'cascade' section with the policy, the tiers that ran and the final label"""
+        results = {}
+        tiers_run = []
+        for tier in self.tiers:
+            TIERS[tier](analyzer, text, results)
+            tiers_run.append(tier)
+            if not self.policy.escalate(tiers_run, results):
+                break
+        results['cascade'] = {
+            'policy': self.policy_name,
+            'tiers': tiers_run,
+            'sentiment': tier_label(tiers_run[-1], results)
+        }
+        return results
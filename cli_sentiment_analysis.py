@@ -4,123 +4,203 @@ Command Line Sentiment Analysis Tool
 A simple command-line interface for sentiment analysis using multiple methods.
 """
 
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from emotion_lexicon import EmotionLexicon
+from result_cache import ResultCache
+from sentiment_engine import (
+    SentimentEngine, VADER_BACKENDS, TEXTBLOB_BACKENDS, EXTRAS, vader_label, textblob_label
+)
+from cascade_scoring import CASCADE_POLICIES, DEFAULT_MARGIN, DEFAULT_TIERS, TIERS, Cascade
+from text_preprocessing import (
+    PreparedText, prepare_text, missing_nltk_data, download_nltk_data
+)
 import argparse
 import sys
+import os
+import csv
 import json
+import multiprocessing
+from collections import deque
 from datetime import datetime
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
 class CLISentimentAnalyzer:
-    def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, emotion_lexicon=None, result_cache=None, sentence_cache_size=4096,
+                 instrumentation=None, vader_backend='reference', textblob_backend='reference',
+                 engine=None, lexicon_file=None, snapshot=None, extras=None, cascade=None):
+        # The scoring itself is done by a sentiment_engine.SentimentEngine,
+        # which may be shared with other front-ends; its backends import and
+        # build their models on first use
+        self.engine = engine or SentimentEngine(emotion_lexicon, vader_backend, textblob_backend,
+                                                lexicon_file)
+        self.vader_backend = self.engine.vader_backend
+        self.textblob_backend = self.engine.textblob_backend
+        # Path of the compiled lexicon file the engine maps, if any
+        self.lexicon_file = self.engine.lexicon_file.path if self.engine.lexicon_file is not None else None
+        # Warm-start file holding the loaded backends (see analyzer_snapshot)
+        self.snapshot = snapshot
+        if snapshot:
+            from analyzer_snapshot import warm_start
+            warm_start(self.engine, snapshot)
+        # None means the built-in keyword lexicon
+        self.emotion_lexicon = self.engine.emotion_lexicon
+        # Optional ResultCache shared by repeated texts
+        self.result_cache = result_cache
+        # The reference and fast backends give the same scores, so they share cache entries
+        self._cache_namespace = self.engine.lexicon.fingerprint()
+        # Per-sentence scores, so re-analyzing an edited document only
+        # rescores the sentences that changed
+        self.sentence_cache = ResultCache(max_size=sentence_cache_size)
+        # Optional instrumentation.Instrumentation collecting per-stage metrics
+        self.instrumentation = instrumentation
+        # Sections from EXTRAS to add to every result; None means all of them,
+        # except with method='cascade', which adds none unless asked
+        self.extras = tuple(extras) if extras is not None else None
+        # cascade_scoring.Cascade used by method='cascade' (default: built on first use)
+        self.cascade = cascade
         
-    def analyze_text(self, text, method='both'):
-        """Analyze sentiment of given text using specified method(s)"""
-        results = {}
+    def analyze_text(self, text, method='both', by_sentence=False):
+        """Analyze sentiment of given text using specified method(s).
         
-        if method in ['vader', 'both']:
-            results['vader'] = self._analyze_vader(text)
-            
-        if method in ['textblob', 'both']:
-            results['textblob'] = self._analyze_textblob(text)
-            
-        results['emotions'] = self._analyze_emotions(text)
-        results['statistics'] = self._get_text_statistics(text)
+        With ``by_sentence`` the text is split into sentences, each sentence is
+        scored on its own and the scores are aggregated (see _analyze_by_sentence).
+        ``method='cascade'`` runs the tiers of ``self.cascade`` (see
+        cascade_scoring) and ignores ``by_sentence``.
+        """
+        if self.instrumentation is not None:
+            label = f"{method}/sentences" if by_sentence else method
+            return self.instrumentation.analyze(label, text, self._analyze_cached,
+                                                text, method, by_sentence)
+        return self._analyze_cached(text, method, by_sentence)
+    
+    def _analyze_cached(self, text, method, by_sentence):
+        """Analyze through the result cache, if there is one"""
+        if method == 'cascade':
+            analyze = self._analyze_cascade
+        else:
+            analyze = self._analyze_by_sentence if by_sentence else self._analyze_uncached
+        if self.result_cache is None:
+            return analyze(text, method)
         
+        key = self.result_cache.make_key(text, self._cache_method(method, by_sentence),
+                                         self._cache_namespace)
+        results = self.result_cache.get(key)
+        if results is None:
+            results = analyze(text, method)
+            self.result_cache.put(key, results)
         return results
     
-    def _analyze_vader(self, text):
-        """Analyze sentiment using VADER"""
-        scores = self.vader_analyzer.polarity_scores(text)
-        
-        # Determine sentiment based on compound score
-        compound = scores['compound']
-        if compound >= 0.05:
-            sentiment = "Positive"
-        elif compound <= -0.05:
-            sentiment = "Negative"
-        else:
-            sentiment = "Neutral"
-            
-        return {
-            'sentiment': sentiment,
-            'compound': compound,
-            'positive': scores['pos'],
-            'neutral': scores['neu'],
-            'negative': scores['neg']
-        }
-    
-    def _analyze_textblob(self, text):
-        """Analyze sentiment using TextBlob"""
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+    def _cache_method(self, method, by_sentence):
+        """What besides the text and lexicon a cached result depends on"""
+        if method == 'cascade':
+            return f"cascade/{self._get_cascade().key()}/{','.join(self._extras_for(method))}"
+        cache_method = f"{method}/sentences" if by_sentence else method
+        extras = self._extras_for(method)
+        if extras != EXTRAS:
+            cache_method += f"/{','.join(extras) or 'no-extras'}"
+        return cache_method
+    
+    def _extras_for(self, method):
+        if self.extras is not None:
+            return self.extras
+        return () if method == 'cascade' else EXTRAS
+    
+    def _get_cascade(self):
+        if self.cascade is None:
+            self.cascade = Cascade()
+        return self.cascade
+    
+    def analyze_record(self, text, method='both', by_sentence=False):
+        """Like analyze_text, but return a compact result_records.AnalysisRecord"""
+        from result_records import AnalysisRecord
+        return AnalysisRecord.from_dict(self.analyze_text(text, method, by_sentence))
+    
+    @property
+    def vader_analyzer(self):
+        """VADER analyzer, built on first use"""
+        return self.engine.backends['vader'].analyzer
+    
+    def _run_stage(self, stage, func, *args):
+        """Call one pipeline stage, timing it when instrumentation is attached"""
+        if self.instrumentation is None:
+            return func(*args)
+        return self.instrumentation.timed(stage, func, *args)
+    
+    def _analyze_uncached(self, text, method='both'):
+        """Run every analysis stage on the text"""
+        return self.engine.analyze(text, method, self._run_stage, self._extras_for(method))
+    
+    def _analyze_cascade(self, text, method='cascade'):
+        """Run the cascade's tiers, then any requested extras"""
+        results = self._get_cascade().analyze(self, text)
+        return self.engine.add_extras(text, results, self._extras_for(method), self._run_stage)
+    
+    def _analyze_by_sentence(self, text, method='both', extras=None):
+        """Score each sentence separately and aggregate the scores.
         
-        # Determine sentiment based on polarity
-        if polarity > 0:
-            sentiment = "Positive"
-        elif polarity < 0:
-            sentiment = "Negative"
-        else:
-            sentiment = "Neutral"
-            
-        return {
-            'sentiment': sentiment,
-            'polarity': polarity,
-            'subjectivity': subjectivity
-        }
-    
-    def _analyze_emotions(self, text):
-        """Simple emotion analysis based on keyword matching"""
-        emotions = {
-            "joy": ["happy", "joy", "excited", "great", "wonderful", "amazing", "fantastic", "love", "like"],
-            "sadness": ["sad", "depressed", "unhappy", "terrible", "awful", "horrible", "disappointed", "hate"],
-            "anger": ["angry", "mad", "furious", "rage", "hate", "terrible", "awful", "horrible"],
-            "fear": ["afraid", "scared", "fear", "terrified", "worried", "anxious", "nervous"],
-            "surprise": ["surprised", "amazed", "shocked", "wow", "incredible", "unbelievable"]
-        }
+        The top-level 'vader' and 'textblob' entries hold token-weighted means
+        (labelled with the usual thresholds) plus an 'aggregate' block with the
+        plain mean, weighted mean, min and max. 'sentences' lists the
+        per-sentence scores.
+        """
+        prepared = self._run_stage('preprocess', prepare_text, text)
+        sentences = [self._analyze_sentence(sentence, method) for sentence in prepared.sentences]
+        return self._combine_sentences(text, method, sentences, prepared.sentence_tokens,
+                                       prepared.sentences, extras)
+    
+    def _combine_sentences(self, text, method, sentences, sentence_tokens, sentence_texts, extras=None):
+        """Aggregate per-sentence scores and add the extras (emotions, statistics) for the whole text"""
+        run = self._run_stage
+        # Weight each sentence by its token count (at least 1)
+        weights = [max(len(tokens), 1) for tokens in sentence_tokens]
+        results = {}
         
-        text_lower = text.lower()
-        emotion_scores = {}
+        if method in ['vader', 'both']:
+            compound = _aggregate([s['vader']['compound'] for s in sentences], weights)
+            results['vader'] = {
+                'sentiment': vader_label(compound['weighted']),
+                'compound': compound['weighted'],
+                'positive': _aggregate([s['vader']['positive'] for s in sentences], weights)['weighted'],
+                'neutral': _aggregate([s['vader']['neutral'] for s in sentences], weights)['weighted'],
+                'negative': _aggregate([s['vader']['negative'] for s in sentences], weights)['weighted'],
+                'aggregate': {'compound': compound}
+            }
         
-        for emotion, keywords in emotions.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                emotion_scores[emotion] = score
-                
-        return emotion_scores
-    
-    def _get_text_statistics(self, text):
-        """Get basic text statistics"""
-        words = word_tokenize(text.lower())
-        stop_words = set(stopwords.words('english'))
+        if method in ['textblob', 'both']:
+            polarity = _aggregate([s['textblob']['polarity'] for s in sentences], weights)
+            subjectivity = _aggregate([s['textblob']['subjectivity'] for s in sentences], weights)
+            results['textblob'] = {
+                'sentiment': textblob_label(polarity['weighted']),
+                'polarity': polarity['weighted'],
+                'subjectivity': subjectivity['weighted'],
+                'aggregate': {'polarity': polarity, 'subjectivity': subjectivity}
+            }
         
-        # Filter out stop words and punctuation
-        filtered_words = [word for word in words if word.isalnum() and word not in stop_words]
+        results['sentences'] = sentences
+        prepared = PreparedText(text, sentence_texts, sentence_tokens)
+        if extras is None:
+            extras = self._extras_for(method)
+        for name in EXTRAS:
+            if name in extras:
+                results[name] = run(name, self.engine.score, name, text, prepared)
         
-        return {
-            "total_words": len(words),
-            "filtered_words": len(filtered_words),
-            "sentences": len(text.split('.')),
-            "avg_word_length": sum(len(word) for word in filtered_words) / len(filtered_words) if filtered_words else 0
-        }
+        return results
+    
+    def _analyze_sentence(self, sentence, method):
+        """Score one sentence, reusing cached scores for unchanged sentences"""
+        key = self.sentence_cache.make_key(sentence, method)
+        scores = self.sentence_cache.get(key)
+        if scores is None:
+            scores = {'text': sentence}
+            if method in ['vader', 'both']:
+                scores['vader'] = self._run_stage('vader', self.engine.score, 'vader', sentence)
+            if method in ['textblob', 'both']:
+                scores['textblob'] = self._run_stage('textblob', self.engine.score, 'textblob', sentence)
+            self.sentence_cache.put(key, scores)
+        return scores
     
     def print_results(self, results, text, method='both'):
-        """Print analysis results in a formatted way"""
+        """Print analysis results (a result dict or AnalysisRecord) in a formatted way"""
+        if hasattr(results, 'to_dict'):
+            results = results.to_dict()
         print("\n" + "="*60)
         print("SENTIMENT ANALYSIS RESULTS")
         print("="*60)
@@ -128,7 +208,7 @@ class CLISentimentAnalyzer:
         print(f"Analysis Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("-"*60)
         
-        if method in ['vader', 'both'] and 'vader' in results:
+        if method in ['vader', 'both', 'cascade'] and 'vader' in results:
             vader = results['vader']
             print("VADER ANALYSIS:")
             print(f"  Sentiment: {vader['sentiment']}")
@@ -138,7 +218,7 @@ class CLISentimentAnalyzer:
             print(f"  Negative: {vader['negative']:.3f}")
             print()
         
-        if method in ['textblob', 'both'] and 'textblob' in results:
+        if method in ['textblob', 'both', 'cascade'] and 'textblob' in results:
             textblob = results['textblob']
             print("TEXTBLOB ANALYSIS:")
             print(f"  Sentiment: {textblob['sentiment']}")
@@ -146,6 +226,13 @@ class CLISentimentAnalyzer:
             print(f"  Subjectivity: {textblob['subjectivity']:.3f}")
             print()
         
+        if 'cascade' in results:
+            cascade = results['cascade']
+            print("CASCADE:")
+            print(f"  Sentiment: {cascade['sentiment']}")
+            print(f"  Tiers Run: {' -> '.join(cascade['tiers'])} ({cascade['policy']} policy)")
+            print()
+        
         if 'emotions' in results and results['emotions']:
             print("EMOTION ANALYSIS:")
             for emotion, score in results['emotions'].items():
@@ -161,8 +248,36 @@ class CLISentimentAnalyzer:
             print(f"  Average Word Length: {stats['avg_word_length']:.1f}")
             print()
         
+        if results.get('sentences'):
+            print("SENTENCE BREAKDOWN:")
+            for sentence in results['sentences']:
+                scores = []
+                if 'vader' in sentence:
+                    scores.append(f"compound {sentence['vader']['compound']:+.3f}")
+                if 'textblob' in sentence:
+                    scores.append(f"polarity {sentence['textblob']['polarity']:+.3f}")
+                snippet = sentence['text'][:50] + ('...' if len(sentence['text']) > 50 else '')
+                print(f"  [{', '.join(scores)}] {snippet}")
+            for name, key in (('vader', 'compound'), ('textblob', 'polarity')):
+                if name in results and 'aggregate' in results[name]:
+                    agg = results[name]['aggregate'][key]
+                    print(f"  {key.capitalize()}: mean {agg['mean']:.3f}, weighted {agg['weighted']:.3f}, "
+                          f"min {agg['min']:.3f}, max {agg['max']:.3f}")
+            print()
+        
         print("="*60)
 
+def _aggregate(values, weights):
+    """Mean, weighted mean, min and max of per-sentence scores"""
+    if not values:
+        return {'mean': 0.0, 'weighted': 0.0, 'min': 0.0, 'max': 0.0}
+    return {
+        'mean': sum(values) / len(values),
+        'weighted': sum(v * w for v, w in zip(values, weights)) / sum(weights),
+        'min': min(values),
+        'max': max(values)
+    }
+
 def interactive_mode():
     """Run the tool in interactive mode"""
     analyzer = CLISentimentAnalyzer()
@@ -208,7 +323,323 @@ def interactive_mode():
         except Exception as e:
             print(f"Error: {e}")
 
-def main():
+# Per-process analyzer used by analyze_many() worker processes
+_worker_analyzer = None
+
+def _init_worker(emotion_lexicon=None, vader_backend='reference', textblob_backend='reference',
+                 lexicon_file=None, snapshot=None, extras=None, cascade=None):
+    """Build the analyzers once per worker process"""
+    global _worker_analyzer
+    _worker_analyzer = CLISentimentAnalyzer(emotion_lexicon=emotion_lexicon,
+                                            vader_backend=vader_backend,
+                                            textblob_backend=textblob_backend,
+                                            lexicon_file=lexicon_file,
+                                            snapshot=snapshot,
+                                            extras=extras,
+                                            cascade=cascade)
+
+def _analyze_chunk(texts, method, by_sentence=False):
+    """Analyze a chunk of texts inside a worker process"""
+    return [_worker_analyzer.analyze_text(text, method=method, by_sentence=by_sentence)
+            for text in texts]
+
+# Marker a caller of analyze_many can put among the texts to have every
+# text before it analyzed and yielded before the next one is read
+FLUSH = object()
+
+def _chunked(iterable, size):
+    """Yield (chunk, flush) pairs: lists of up to ``size`` items from ``iterable``,
+    cut short at a FLUSH marker (with ``flush`` True)"""
+    chunk = []
+    for item in iterable:
+        if item is FLUSH:
+            yield chunk, True
+            chunk = []
+            continue
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk, False
+            chunk = []
+    if chunk:
+        yield chunk, False
+
+def analyze_many(texts, method='both', workers=None, chunksize=64, analyzer=None,
+                 by_sentence=False, as_records=False):
+    """Analyze an iterable of texts on a process pool, yielding results in input order.
+
+    Each worker builds its own CLISentimentAnalyzer once. Texts are sent to the
+    pool in chunks of ``chunksize`` and at most two chunks per worker are in
+    flight, so the input is consumed lazily and memory stays bounded. With
+    ``workers=1`` everything runs in the current process (reusing ``analyzer``
+    if given). Otherwise workers are configured like ``analyzer``. With
+    ``as_records`` results are yielded as compact AnalysisRecord objects.
+    Chunks that finish early are yielded without waiting for the pool to
+    fill, and a FLUSH item among the texts sends the partial chunk and waits
+    for every result before reading on.
+    """
+    if as_records:
+        from result_records import AnalysisRecord
+        results = analyze_many(texts, method, workers, chunksize, analyzer, by_sentence)
+        for result in results:
+            yield AnalysisRecord.from_dict(result)
+        return
+    
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        analyzer = analyzer or CLISentimentAnalyzer()
+        for text in texts:
+            if text is not FLUSH:
+                yield analyzer.analyze_text(text, method=method, by_sentence=by_sentence)
+        return
+    
+    max_pending = workers * 2
+    # A mapped emotion lexicon pickles as its file path, so workers map the same file
+    initargs = ((analyzer.emotion_lexicon, analyzer.vader_backend, analyzer.textblob_backend,
+                 analyzer.lexicon_file, analyzer.snapshot, analyzer.extras,
+                 analyzer.cascade) if analyzer else ())
+    cache = analyzer.result_cache if analyzer else None
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for chunk, flush in _chunked(texts, chunksize):
+            if chunk:
+                pending.append(_submit_chunk(pool, analyzer, cache, chunk, method, by_sentence))
+            if flush:
+                while pending:
+                    yield from _collect_chunk(cache, *pending.popleft())
+                continue
+            if len(pending) >= max_pending:
+                yield from _collect_chunk(cache, *pending.popleft())
+            while pending and (pending[0][2] is None or pending[0][2].ready()):
+                yield from _collect_chunk(cache, *pending.popleft())
+        while pending:
+            yield from _collect_chunk(cache, *pending.popleft())
+
+def _submit_chunk(pool, analyzer, cache, chunk, method, by_sentence=False):
+    """Send the cache misses of a chunk to the pool"""
+    args = (method, by_sentence)
+    if cache is None:
+        return None, [None] * len(chunk), pool.apply_async(_analyze_chunk, (chunk,) + args)
+    
+    cache_method = analyzer._cache_method(method, by_sentence)
+    keys = [cache.make_key(text, cache_method, analyzer._cache_namespace) for text in chunk]
+    cached = [cache.get(key) for key in keys]
+    misses = [text for text, result in zip(chunk, cached) if result is None]
+    async_result = pool.apply_async(_analyze_chunk, (misses,) + args) if misses else None
+    return keys, cached, async_result
+
+def _collect_chunk(cache, keys, cached, async_result):
+    """Merge pool results with cached ones, in input order"""
+    computed = iter(async_result.get() if async_result is not None else ())
+    for i, result in enumerate(cached):
+        if result is None:
+            result = next(computed)
+            if cache is not None:
+                cache.put(keys[i], result)
+        yield result
+
+def iter_input_texts(stream, input_format='lines', text_field='text'):
+    """Yield (record_id, text) pairs from an input stream, one record at a time.
+
+    ``input_format`` is one of 'lines' (one text per line), 'jsonl' (one JSON
+    object per line, text taken from ``text_field``) or 'csv' (text taken from
+    the ``text_field`` column). Records are read lazily so arbitrarily large
+    inputs are processed in constant memory.
+    """
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None or text_field not in reader.fieldnames:
+            raise ValueError(f"CSV input has no column named '{text_field}'")
+        for line_number, row in enumerate(reader, 1):
+            text = (row.get(text_field) or '').strip()
+            if text:
+                yield row.get('id') or line_number, text
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if input_format == 'jsonl':
+            record = json.loads(line)
+            text = record.get(text_field) if isinstance(record, dict) else None
+            if not isinstance(text, str):
+                raise ValueError(f"Line {line_number}: no text field '{text_field}'")
+            yield record.get('id', line_number), text
+        else:
+            yield line_number, line
+
+def run_batch(analyzer, records, out, method='both', workers=1, chunksize=64, by_sentence=False,
+              collector=None, near_duplicates=None):
+    """Analyze (record_id, text) pairs and stream the results to ``out``.
+    
+    ``out`` is a result_exporters exporter, or a text stream that receives
+    one JSON result per line. If given, ``collector`` (e.g. a result_frames.ResultFrameBuilder) also
+    receives every result via ``collector.append(result, record_id)``.
+    
+    With ``near_duplicates`` (a near_duplicates.NearDuplicateIndex) texts
+    that closely match an earlier one are not scored: they get its result
+    plus a 'duplicate' section with its record id and the similarity.
+    """
+    from result_exporters import JSONLExporter, ResultExporter
+    exporter = out if isinstance(out, ResultExporter) else JSONLExporter(out)
+    
+    # Records not written yet, in input order, as [record, result, (representative,
+    # similarity), scored]. Near duplicates are written as soon as every
+    # record ahead of them is. While representatives are still being scored,
+    # at most max_buffered records (about what the pool holds) wait; then
+    # the pool is flushed so their results arrive and the backlog drains.
+    in_flight = deque()
+    max_buffered = chunksize * (2 * (workers or os.cpu_count() or 1) + 1)
+    waiting = 0
+    count = 0
+    
+    def emit(entry):
+        nonlocal count
+        (record_id, text), result, duplicate, _ = entry
+        if duplicate is not None:
+            # The representative came earlier in the input, so it has its result
+            representative, similarity = duplicate
+            result = dict(representative[1])
+            result['duplicate'] = {'of': representative[0][0], 'similarity': similarity}
+        exporter.write(record_id, text, method, result)
+        if collector is not None:
+            collector.append(result, record_id)
+        count += 1
+    
+    def emit_unscored():
+        while in_flight and not in_flight[0][3]:
+            emit(in_flight.popleft())
+    
+    def texts():
+        nonlocal waiting
+        for record in records:
+            entry = [record, None, None, False]
+            in_flight.append(entry)
+            if near_duplicates is not None:
+                entry[2] = near_duplicates.match(record[1], entry)
+                if entry[2] is not None:
+                    if waiting and len(in_flight) > max_buffered:
+                        yield FLUSH
+                    if not waiting:
+                        emit_unscored()
+                    continue
+            entry[3] = True
+            waiting += 1
+            yield record[1]
+    
+    results = analyze_many(texts(), method=method, workers=workers,
+                           chunksize=chunksize, analyzer=analyzer, by_sentence=by_sentence)
+    for result in results:
+        emit_unscored()
+        entry = in_flight.popleft()
+        entry[1] = result
+        waiting -= 1
+        emit(entry)
+        emit_unscored()
+    emit_unscored()
+    exporter.flush()
+    return count
+
+def _positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def _write_metrics(instrumentation, path):
+    """Write collected metrics (and any cProfile samples) after a run"""
+    instrumentation.write(path)
+    if instrumentation.profiled_calls:
+        profile_path = path + '.profile.txt'
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            f.write(instrumentation.profile_report())
+        print(f"Profile of {instrumentation.profiled_calls} sampled analyses saved to {profile_path}",
+              file=sys.stderr)
+
+def _open_batch_input(path):
+    """Open a batch input file, treating '-' as stdin"""
+    if path == '-':
+        return sys.stdin
+    return open(path, 'r', encoding='utf-8', newline='')
+
+def setup_main(argv):
+    """Download (or just check) the NLTK data the analyzer needs"""
+    parser = argparse.ArgumentParser(
+        prog='cli_sentiment_analysis.py setup',
+        description="Download the NLTK data used for tokenization and stopwords. "
+                    "This is the only command that accesses the network."
+    )
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help='Only report missing data, do not download'
+    )
+    parser.add_argument(
+        '--quiet',
+        '-q',
+        action='store_true',
+        help='Suppress NLTK download progress'
+    )
+    args = parser.parse_args(argv)
+    
+    missing = missing_nltk_data()
+    if args.check:
+        if missing:
+            print(f"Missing NLTK data: {', '.join(missing)}")
+            sys.exit(1)
+        print("All NLTK data is installed.")
+        return
+    
+    download_nltk_data(missing, quiet=args.quiet)
+    still_missing = missing_nltk_data()
+    # punkt and punkt_tab serve different NLTK versions; one of them is enough
+    if 'punkt' in still_missing and 'punkt_tab' not in still_missing:
+        still_missing.remove('punkt')
+    if 'punkt_tab' in still_missing and 'punkt' not in still_missing:
+        still_missing.remove('punkt_tab')
+    if still_missing:
+        print(f"Failed to download NLTK data: {', '.join(still_missing)}", file=sys.stderr)
+        sys.exit(1)
+    print("NLTK data is ready.")
+
+def serve_main(argv):
+    """Run the long-lived scoring server (see sentiment_server.py)"""
+    from sentiment_server import serve_main as run_server
+    run_server(argv)
+
+def benchmark_main(argv):
+    """Run the pipeline benchmark suite (see benchmark.py)"""
+    from benchmark import main as run_benchmark
+    run_benchmark(argv)
+
+def compile_lexicon_main(argv):
+    """Build or inspect a compiled lexicon file (see compiled_lexicon.py)"""
+    from compiled_lexicon import main as run_compiler
+    run_compiler(argv)
+
+# Subcommands dispatched before the regular argument parser
+COMMANDS = {
+    'setup': setup_main,
+    'download-data': setup_main,
+    'serve': serve_main,
+    'benchmark': benchmark_main,
+    'compile-lexicon': compile_lexicon_main
+}
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+    
     parser = argparse.ArgumentParser(
         description="Sentiment Analysis Tool - Analyze text sentiment using VADER and TextBlob",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -218,6 +649,22 @@ Examples:
   python cli_sentiment_analysis.py --method vader "This is terrible"
   python cli_sentiment_analysis.py --interactive
   python cli_sentiment_analysis.py --json "Some text here"
+  python cli_sentiment_analysis.py --batch reviews.txt --output results.jsonl
+  python cli_sentiment_analysis.py --batch reviews.jsonl --input-format jsonl --text-field body
+  cat reviews.csv | python cli_sentiment_analysis.py --batch - --input-format csv
+  python cli_sentiment_analysis.py --batch reviews.txt --workers 0 --output results.jsonl
+  python cli_sentiment_analysis.py --batch reviews.txt --vader-backend fast --textblob-backend fast
+  python cli_sentiment_analysis.py compile-lexicon build lexicons.bin
+  python cli_sentiment_analysis.py --batch reviews.txt --workers 0 --vader-backend fast --lexicon-file lexicons.bin
+  python cli_sentiment_analysis.py --snapshot ~/.cache/sentiment.snapshot "Great service!"
+  python cli_sentiment_analysis.py --batch reviews.txt --output results.csv.gz
+  python cli_sentiment_analysis.py --batch complaints.csv --input-format csv --near-duplicates 0.8
+  python cli_sentiment_analysis.py --batch reviews.txt --method cascade --cascade-policy disagree
+  python cli_sentiment_analysis.py --batch reviews.txt --extras none --output labels.csv
+  python cli_sentiment_analysis.py --batch reviews.txt --output results.parquet --compression zstd
+  python cli_sentiment_analysis.py setup    (download NLTK data; no other command uses the network)
+  python cli_sentiment_analysis.py serve --port 8765 --unix-socket /tmp/sentiment.sock
+  python cli_sentiment_analysis.py benchmark --corpus samples --docs 200 --output bench.json
         """
     )
     
@@ -229,9 +676,42 @@ Examples:
     
     parser.add_argument(
         '--method',
-        choices=['vader', 'textblob', 'both'],
+        choices=['vader', 'textblob', 'both', 'cascade'],
         default='both',
-        help='Analysis method to use (default: both)'
+        help="Analysis method to use; 'cascade' runs the --cascade-tiers in turn, "
+             "stopping once the policy is satisfied (default: both)"
+    )
+    
+    parser.add_argument(
+        '--cascade-policy',
+        choices=list(CASCADE_POLICIES),
+        default='ambiguous',
+        help="When --method cascade runs the next tier: 'ambiguous' if the last score is near a "
+             "label threshold, 'disagree' also if the tiers so far disagree, 'always' every tier "
+             "(default: ambiguous)"
+    )
+    
+    parser.add_argument(
+        '--cascade-tiers',
+        default=','.join(DEFAULT_TIERS),
+        metavar='TIERS',
+        help=f"Comma-separated tiers for --method cascade, cheapest first, from: {', '.join(TIERS)} "
+             f"(default: {','.join(DEFAULT_TIERS)})"
+    )
+    
+    parser.add_argument(
+        '--cascade-margin',
+        type=float,
+        default=DEFAULT_MARGIN,
+        metavar='MARGIN',
+        help=f"Distance from a label threshold within which a score is ambiguous (default: {DEFAULT_MARGIN})"
+    )
+    
+    parser.add_argument(
+        '--extras',
+        metavar='NAMES',
+        help=f"Comma-separated extra sections to compute, from: {', '.join(EXTRAS)}, or 'none' "
+             f"(default: all, except none with --method cascade)"
     )
     
     parser.add_argument(
@@ -250,12 +730,232 @@ Examples:
     parser.add_argument(
         '--output',
         '-o',
-        help='Output file for results (works with --json)'
+        help='Output file for results (works with --json and --batch)'
     )
     
-    args = parser.parse_args()
+    parser.add_argument(
+        '--batch',
+        '-b',
+        metavar='FILE',
+        help="Analyze every record in FILE ('-' for stdin) and write one JSON result per line"
+    )
     
-    analyzer = CLISentimentAnalyzer()
+    parser.add_argument(
+        '--input-format',
+        choices=['lines', 'jsonl', 'csv'],
+        default='lines',
+        help='Batch input format (default: lines)'
+    )
+    
+    parser.add_argument(
+        '--text-field',
+        default='text',
+        help='JSONL field or CSV column holding the text in batch mode (default: text)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        '-w',
+        type=int,
+        default=1,
+        help='Worker processes for batch mode (default: 1, 0 = one per CPU)'
+    )
+    
+    parser.add_argument(
+        '--chunksize',
+        type=_positive_int,
+        default=64,
+        help='Texts sent to a worker at a time in batch mode (default: 64)'
+    )
+    
+    parser.add_argument(
+        '--output-format',
+        choices=['jsonl', 'csv', 'parquet'],
+        help='Batch output format (default: from the --output extension, else jsonl)'
+    )
+    
+    parser.add_argument(
+        '--compression',
+        choices=['none', 'gzip', 'zstd'],
+        help='Compress batch output (default: from a .gz/.zst --output extension, else none)'
+    )
+    
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='After a batch run, print per-label document counts and mean scores (needs pandas)'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        help='Write per-stage timing metrics after the run (.json for JSON, otherwise Prometheus text)'
+    )
+    
+    parser.add_argument(
+        '--profile-every',
+        type=int,
+        default=0,
+        metavar='N',
+        help='With --metrics, profile 1 in N analyses with cProfile (report written next to FILE)'
+    )
+    
+    parser.add_argument(
+        '--sentences',
+        action='store_true',
+        help='Score each sentence separately and aggregate (for long documents)'
+    )
+    
+    parser.add_argument(
+        '--vader-backend',
+        choices=VADER_BACKENDS,
+        default='reference',
+        help="VADER implementation: 'fast' gives identical scores several times faster (default: reference)"
+    )
+    
+    parser.add_argument(
+        '--textblob-backend',
+        choices=TEXTBLOB_BACKENDS,
+        default='reference',
+        help="TextBlob implementation: 'fast' gives identical scores several times faster (default: reference)"
+    )
+    
+    parser.add_argument(
+        '--emotion-lexicon',
+        metavar='FILE',
+        help='Emotion lexicon to use instead of the built-in keywords (JSON, or term,emotion rows)'
+    )
+    
+    parser.add_argument(
+        '--lexicon-file',
+        metavar='FILE',
+        help='Compiled lexicon file (see compile-lexicon) memory-mapped by the fast backends and the emotion scorer'
+    )
+    
+    parser.add_argument(
+        '--snapshot',
+        metavar='FILE',
+        help='Warm-start file: restore the loaded analyzers from FILE, or create it (rebuilt when stale)'
+    )
+    
+    parser.add_argument(
+        '--near-duplicates',
+        type=float,
+        nargs='?',
+        const=0.8,
+        metavar='THRESHOLD',
+        help='In batch mode, reuse the result of an earlier text whose estimated word-pair '
+             'similarity is at least THRESHOLD (default 0.8) instead of scoring the text'
+    )
+    
+    parser.add_argument(
+        '--near-duplicate-window',
+        type=int,
+        default=10000,
+        metavar='N',
+        help='Distinct texts remembered for --near-duplicates matching (default: 10000)'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse results for repeated texts (in-memory LRU cache)'
+    )
+    
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=10000,
+        help='Maximum results kept in memory by the cache (default: 10000)'
+    )
+    
+    parser.add_argument(
+        '--cache-db',
+        metavar='FILE',
+        help='SQLite file backing the cache across runs (implies --cache)'
+    )
+    
+    args = parser.parse_args(argv)
+    if args.sentences and args.method == 'cascade':
+        parser.error("--sentences does not apply to --method cascade (use the 'sentences' tier)")
+    extras = None
+    if args.extras is not None:
+        extras = tuple(name.strip() for name in args.extras.split(',')
+                       if name.strip() and name.strip() != 'none')
+        unknown = [name for name in extras if name not in EXTRAS]
+        if unknown:
+            parser.error(f"unknown extras: {', '.join(unknown)} (choose from: {', '.join(EXTRAS)}, none)")
+    cascade = None
+    if args.method == 'cascade':
+        try:
+            cascade = Cascade(args.cascade_policy, args.cascade_tiers.split(','), args.cascade_margin)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    emotion_lexicon = EmotionLexicon.from_file(args.emotion_lexicon) if args.emotion_lexicon else None
+    result_cache = None
+    if args.cache or args.cache_db:
+        result_cache = ResultCache(max_size=args.cache_size, db_path=args.cache_db)
+    instrumentation = None
+    if args.metrics:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation(profile_every=args.profile_every)
+    analyzer = CLISentimentAnalyzer(emotion_lexicon=emotion_lexicon, result_cache=result_cache,
+                                    instrumentation=instrumentation, vader_backend=args.vader_backend,
+                                    textblob_backend=args.textblob_backend, lexicon_file=args.lexicon_file,
+                                    snapshot=os.path.expanduser(args.snapshot) if args.snapshot else None,
+                                    extras=extras, cascade=cascade)
+    
+    # Batch mode: stream records through a single analyzer instance
+    if args.batch:
+        try:
+            source = _open_batch_input(args.batch)
+            from result_exporters import open_exporter
+            out = open_exporter(args.output or sys.stdout, args.output_format, args.compression)
+            collector = None
+            if args.summary:
+                from result_frames import ResultFrameBuilder
+                collector = ResultFrameBuilder()
+            near_duplicates = None
+            if args.near_duplicates is not None:
+                from near_duplicates import NearDuplicateIndex
+                near_duplicates = NearDuplicateIndex(args.near_duplicates, args.near_duplicate_window)
+            try:
+                records = iter_input_texts(source, args.input_format, args.text_field)
+                count = run_batch(analyzer, records, out, method=args.method,
+                                  workers=args.workers or None, chunksize=args.chunksize,
+                                  by_sentence=args.sentences, collector=collector,
+                                  near_duplicates=near_duplicates)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+                out.close()
+            if args.output:
+                print(f"Analyzed {count} texts, results saved to {args.output}")
+            if collector is not None:
+                from result_frames import summarize
+                by = {'textblob': 'textblob_sentiment',
+                      'cascade': 'cascade_sentiment'}.get(args.method, 'vader_sentiment')
+                summary = summarize(collector.to_frame(), by=by)
+                print(summary.to_string(float_format=lambda v: f"{v:.3f}"), file=sys.stderr)
+            if result_cache is not None:
+                print(f"Cache: {json.dumps(result_cache.stats())}", file=sys.stderr)
+            if near_duplicates is not None:
+                stats = near_duplicates.stats()
+                print(f"Near-duplicates: {stats['duplicates']} of {stats['documents']} texts "
+                      f"reused an earlier result ({stats['scored']} scored)", file=sys.stderr)
+            if instrumentation is not None:
+                _write_metrics(instrumentation, args.metrics)
+                if args.workers != 1:
+                    print("Note: --metrics only covers work done in the main process; "
+                          "use --workers 1 for per-stage timings", file=sys.stderr)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if result_cache is not None:
+                result_cache.close()
+        return
     
     # If no text provided and not interactive, run interactive mode
     if not args.text and not args.interactive:
@@ -269,7 +969,11 @@ Examples:
     
     # Analyze the provided text
     try:
-        results = analyzer.analyze_text(args.text, method=args.method)
+        results = analyzer.analyze_text(args.text, method=args.method, by_sentence=args.sentences)
+        if result_cache is not None:
+            result_cache.close()
+        if instrumentation is not None:
+            _write_metrics(instrumentation, args.metrics)
         
         if args.json:
             output_data = {
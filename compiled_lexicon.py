@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Compiled Lexicon
+Compiles the VADER, TextBlob and emotion lexicons into one binary file that
+is memory-mapped read-only. Every process that opens the file shares the
+same physical pages, so worker pools and servers no longer keep a private
+parsed copy per process, and opening it costs the same whatever the size of
+the lexicons.
+
+File layout: an 8-byte magic, the length of a JSON header, the header
+(format, byte order, metadata and the position of every array), then the
+arrays, each 8-byte aligned. Each table stores its UTF-8 keys in sorted order
+(an offsets array plus one byte blob), an open-addressing hash index of
+int32 slots keyed by CRC-32, and one array per value column: float64 for
+scores, offsets plus a blob for strings.
+
+    python compiled_lexicon.py build lexicons.bin
+    python cli_sentiment_analysis.py --lexicon-file lexicons.bin --vader-backend fast ...
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+
+MAGIC = b'SALEX\x00\x01\n'
+FORMAT_VERSION = 1
+
+# Entries each table keeps decoded per process, so repeated words cost a
+# dict lookup instead of a probe of the mapped index
+MEMO_SIZE = 1 << 16
+
+_MISSING = object()
+
+def _aligned(size):
+    return (size + 7) & ~7
+
+def _encode_value(kind, value):
+    """UTF-8 bytes of a string column value"""
+    if kind == 'str':
+        return value.encode('utf-8')
+    if kind == 'strs':
+        return '\t'.join(value).encode('utf-8')
+    if kind == 'phrases':
+        return '\t'.join(' '.join(words) for words in value).encode('utf-8')
+    raise ValueError(f"Unknown column kind: {kind}")
+
+def _decode_value(kind, data):
+    text = data.decode('utf-8')
+    if kind == 'str':
+        return text
+    if kind == 'strs':
+        return tuple(text.split('\t')) if text else ()
+    return tuple(tuple(phrase.split(' ')) for phrase in text.split('\t')) if text else ()
+
+def write_lexicon_file(path, tables, meta=None):
+    """Write tables to ``path``.
+
+    ``tables`` maps a table name to ``(columns, rows)``: ``columns`` is a
+    list of (name, kind) with kind 'f8' (float), 'str' (string), 'strs'
+    (tuple of strings) or 'phrases' (tuple of word tuples), and ``rows`` maps
+    each key to its value, a tuple when there is more than one column.
+    """
+    arrays = []
+    offset = 0
+    specs = {}
+
+    def add(data):
+        nonlocal offset
+        data = bytes(data)
+        position = offset
+        arrays.append(data)
+        padding = _aligned(len(data)) - len(data)
+        if padding:
+            arrays.append(b'\0' * padding)
+        offset += len(data) + padding
+        return [position, len(data)]
+
+    for name, (columns, rows) in tables.items():
+        keys = sorted(rows, key=lambda key: key.encode('utf-8'))
+        encoded = [key.encode('utf-8') for key in keys]
+        key_offsets = array('I', [0])
+        for key in encoded:
+            key_offsets.append(key_offsets[-1] + len(key))
+
+        slot_count = 8
+        while slot_count < 2 * len(keys):
+            slot_count *= 2
+        slots = array('i', [-1]) * slot_count
+        mask = slot_count - 1
+        for index, key in enumerate(encoded):
+            slot = zlib.crc32(key) & mask
+            while slots[slot] != -1:
+                slot = (slot + 1) & mask
+            slots[slot] = index
+
+        spec = {
+            'count': len(keys),
+            'slots': slot_count,
+            'columns': [list(column) for column in columns],
+            'arrays': {
+                'key_offsets': add(key_offsets.tobytes()),
+                'keys': add(b''.join(encoded)),
+                'slots': add(slots.tobytes())
+            }
+        }
+        for position, (column, kind) in enumerate(columns):
+            values = [rows[key] if len(columns) == 1 else rows[key][position] for key in keys]
+            if kind == 'f8':
+                spec['arrays'][column] = add(array('d', [float(value) for value in values]).tobytes())
+            else:
+                blobs = [_encode_value(kind, value) for value in values]
+                value_offsets = array('I', [0])
+                for blob in blobs:
+                    value_offsets.append(value_offsets[-1] + len(blob))
+                spec['arrays'][column + '_offsets'] = add(value_offsets.tobytes())
+                spec['arrays'][column] = add(b''.join(blobs))
+        specs[name] = spec
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'meta': meta or {},
+        'tables': specs
+    }).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(b'\0' * (data_start - len(MAGIC) - 8 - len(header)))
+        for data in arrays:
+            f.write(data)
+    # Processes that already mapped the old file keep their pages
+    os.replace(temporary, path)
+
+class MappedTable(Mapping):
+    """Read-only mapping over one table of a LexiconFile.
+
+    A single-column table returns the value itself, otherwise a tuple.
+    Lookups probe the mapped hash index; the last ``MEMO_SIZE`` distinct
+    keys looked up (hits and misses) are remembered in a small dict.
+    """
+
+    def __init__(self, lexicon_file, name, spec, buffer):
+        self.lexicon_file = lexicon_file
+        self.name = name
+        self.columns = [tuple(column) for column in spec['columns']]
+        self._count = spec['count']
+        self._mask = spec['slots'] - 1
+        self._memo = {}
+        view = memoryview(buffer)
+
+        def region(array_name, typecode=None):
+            start, length = spec['arrays'][array_name]
+            part = view[lexicon_file.data_start + start:lexicon_file.data_start + start + length]
+            return part.cast(typecode) if typecode else part
+
+        self._key_offsets = region('key_offsets', 'I')
+        self._keys = region('keys')
+        self._slots = region('slots', 'i')
+        self._values = []
+        for column, kind in self.columns:
+            if kind == 'f8':
+                self._values.append((kind, region(column, 'd'), None))
+            else:
+                self._values.append((kind, region(column), region(column + '_offsets', 'I')))
+
+    def _index(self, key):
+        """Position of ``key`` in the table, or -1"""
+        data = key.encode('utf-8')
+        slots, offsets, keys = self._slots, self._key_offsets, self._keys
+        mask = self._mask
+        slot = zlib.crc32(data) & mask
+        while True:
+            index = slots[slot]
+            if index < 0:
+                return -1
+            start, end = offsets[index], offsets[index + 1]
+            if end - start == len(data) and keys[start:end] == data:
+                return index
+            slot = (slot + 1) & mask
+
+    def _value(self, index):
+        values = []
+        for kind, column, offsets in self._values:
+            if kind == 'f8':
+                values.append(column[index])
+            else:
+                values.append(_decode_value(kind, column[offsets[index]:offsets[index + 1]].tobytes()))
+        return values[0] if len(values) == 1 else tuple(values)
+
+    def get(self, key, default=None):
+        memo = self._memo
+        try:
+            value = memo[key]
+        except KeyError:
+            if not isinstance(key, str):
+                return default
+            index = self._index(key)
+            value = self._value(index) if index >= 0 else _MISSING
+            if len(memo) >= MEMO_SIZE:
+                memo.clear()
+            memo[key] = value
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        offsets, keys = self._key_offsets, self._keys
+        for index in range(self._count):
+            yield keys[offsets[index]:offsets[index + 1]].tobytes().decode('utf-8')
+
+    def __reduce__(self):
+        # Worker processes map the same file instead of receiving a copy
+        return _open_table, (self.lexicon_file.path, self.name)
+
+class LexiconFile:
+    """A compiled lexicon file, memory-mapped read-only"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a compiled lexicon file")
+        header_length = struct.unpack('<Q', self._mmap[len(MAGIC):len(MAGIC) + 8])[0]
+        header = json.loads(self._mmap[len(MAGIC) + 8:len(MAGIC) + 8 + header_length].decode('utf-8'))
+        if header['format'] != FORMAT_VERSION:
+            raise ValueError(f"{path} has format {header['format']}, expected {FORMAT_VERSION}; rebuild it")
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was built on a {header['byteorder']}-endian machine; rebuild it")
+        self.meta = header['meta']
+        self.data_start = _aligned(len(MAGIC) + 8 + header_length)
+        self.tables = {name: MappedTable(self, name, spec, self._mmap)
+                       for name, spec in header['tables'].items()}
+
+    def __contains__(self, name):
+        return name in self.tables
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def emotion_lexicon(self):
+        """The compiled emotion lexicon as an EmotionLexicon, or None if the file has none"""
+        if 'emotion_terms' not in self.tables:
+            return None
+        from emotion_lexicon import EmotionLexicon
+        return EmotionLexicon.from_tables(self.meta['emotions'], self.tables['emotion_terms'],
+                                          self.tables['emotion_phrases'], self.meta.get('emotion_fingerprint'))
+
+    def __reduce__(self):
+        return open_lexicon_file, (self.path,)
+
+# Files opened by this process, so every table of a file shares one mapping
+_open_files = {}
+
+def open_lexicon_file(path):
+    """Open (or reuse this process's mapping of) a compiled lexicon file"""
+    path = os.path.abspath(path)
+    lexicon_file = _open_files.get(path)
+    if lexicon_file is None:
+        lexicon_file = _open_files[path] = LexiconFile(path)
+    return lexicon_file
+
+def _open_table(path, name):
+    return open_lexicon_file(path)[name]
+
+def _package_versions():
+    from importlib import metadata
+    versions = {}
+    for package in ('vaderSentiment', 'textblob'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+def source_tables(emotion_lexicon=None):
+    """(tables, meta) for write_lexicon_file, loaded from the installed lexicons"""
+    from emotion_lexicon import DEFAULT_LEXICON
+    from fast_textblob import FastTextBlob
+    from fast_vader import FastVader, _package_file as vader_file
+    from fast_textblob import _package_file as textblob_file
+
+    emotion_lexicon = emotion_lexicon if emotion_lexicon is not None else DEFAULT_LEXICON
+    textblob = FastTextBlob._load_lexicon(textblob_file('en', 'en-sentiment.xml'))
+    tables = {
+        'vader': ([('valence', 'f8')], FastVader._load_lexicon(vader_file('vader_lexicon.txt'))),
+        'vader_emojis': ([('description', 'str')], FastVader._load_emojis(vader_file('emoji_utf8_lexicon.txt'))),
+        'textblob': ([('polarity', 'f8'), ('subjectivity', 'f8'), ('intensity', 'f8'), ('modifier', 'f8')],
+                     {word: (p, s, i, 1.0 if modifier else 0.0) for word, (p, s, i, modifier) in textblob.items()}),
+        'emotion_terms': ([('emotions', 'strs')], dict(emotion_lexicon._term_emotions)),
+        'emotion_phrases': ([('phrases', 'phrases')],
+                            {word: sorted(phrases) for word, phrases in emotion_lexicon._phrases.items()})
+    }
+    meta = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'versions': _package_versions(),
+        'emotions': list(emotion_lexicon.emotions),
+        'emotion_fingerprint': emotion_lexicon.fingerprint()
+    }
+    return tables, meta
+
+def build(path, emotion_lexicon=None):
+    """Compile the installed VADER and TextBlob lexicons and an emotion lexicon into ``path``"""
+    tables, meta = source_tables(emotion_lexicon)
+    write_lexicon_file(path, tables, meta)
+    return {name: len(rows) for name, (_, rows) in tables.items()}
+
+def verify(path, emotion_lexicon=None):
+    """Names of the tables in ``path`` that differ from the installed lexicons"""
+    lexicon_file = LexiconFile(path)
+    tables, _ = source_tables(emotion_lexicon)
+    stale = []
+    for name, (columns, rows) in tables.items():
+        if name not in lexicon_file:
+            stale.append(name)
+            continue
+        mapped = lexicon_file[name]
+        if len(mapped) != len(rows):
+            stale.append(name)
+            continue
+        kinds = [kind for _, kind in columns]
+        for key, value in rows.items():
+            if kinds[0] in ('strs', 'phrases'):
+                value = tuple(tuple(item) if kinds[0] == 'phrases' else item for item in value)
+            if mapped.get(key) != value:
+                stale.append(name)
+                break
+    return stale
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a compiled lexicon file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Compile the lexicons into FILE')
+    build_parser.add_argument('file')
+    build_parser.add_argument('--emotion-lexicon', metavar='FILE',
+                              help='Emotion lexicon to compile instead of the built-in keywords')
+    info_parser = subparsers.add_parser('info', help='Show the tables and metadata of FILE')
+    info_parser.add_argument('file')
+    verify_parser = subparsers.add_parser('verify', help='Check FILE against the installed lexicons')
+    verify_parser.add_argument('file')
+    verify_parser.add_argument('--emotion-lexicon', metavar='FILE',
+                               help='Emotion lexicon FILE was compiled from')
+    args = parser.parse_args(argv)
+
+    emotion_lexicon = None
+    if getattr(args, 'emotion_lexicon', None):
+        from emotion_lexicon import EmotionLexicon
+        emotion_lexicon = EmotionLexicon.from_file(args.emotion_lexicon)
+
+    if args.command == 'build':
+        counts = build(args.file, emotion_lexicon)
+        print(f"Wrote {args.file} ({os.path.getsize(args.file) / 1024:.0f} KB): "
+              + ", ".join(f"{name} {count}" for name, count in counts.items()))
+    elif args.command == 'info':
+        lexicon_file = LexiconFile(args.file)
+        print(json.dumps(lexicon_file.meta, indent=2))
+        for name, table in lexicon_file.tables.items():
+            print(f"{name}: {len(table)} entries, columns {', '.join(column for column, _ in table.columns)}")
+    else:
+        stale = verify(args.file, emotion_lexicon)
+        if stale:
+            print(f"{args.file} is out of date ({', '.join(stale)}); rebuild it")
+            sys.exit(1)
+        print(f"{args.file} matches the installed lexicons")
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ with various examples of different sentiment types.
 """
 
 from cli_sentiment_analysis import CLISentimentAnalyzer
+from sentiment_engine import BACKENDS, SentimentEngine
 import time
 
 def run_demo():
@@ -96,11 +97,13 @@ def quick_test():
     """Run a quick test to verify the tool is working"""
     print("Running quick functionality test...")
     
-    analyzer = CLISentimentAnalyzer()
+    engine = SentimentEngine()
     test_text = "This is a test of the sentiment analysis tool."
     
     try:
-        results = analyzer.analyze_text(test_text, method='both')
+        for name in BACKENDS:
+            engine.score(name, test_text)
+            print(f"✓ {name} backend working")
         print("✓ Tool is working correctly!")
         print("✓ All analysis methods functioning")
         print("✓ Ready for use")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Emotion Lexicon
+Compiles emotion keyword lists into a token index so a text is scored with a
+single pass over its words, whatever the size of the lexicon.
+"""
+
+import re
+import csv
+import json
+import hashlib
+from collections import defaultdict
+
+# Built-in keyword lists used by both the GUI and the CLI
+DEFAULT_EMOTIONS = {
+    "joy": ["happy", "joy", "excited", "great", "wonderful", "amazing", "fantastic", "love", "like"],
+    "sadness": ["sad", "depressed", "unhappy", "terrible", "awful", "horrible", "disappointed", "hate"],
+    "anger": ["angry", "mad", "furious", "rage", "hate", "terrible", "awful", "horrible"],
+    "fear": ["afraid", "scared", "fear", "terrified", "worried", "anxious", "nervous"],
+    "surprise": ["surprised", "amazed", "shocked", "wow", "incredible", "unbelievable"]
+}
+
+_WORD_PATTERN = re.compile(r"\w+(?:'\w+)*")
+
+def tokenize_words(text):
+    """Split text into lowercase word tokens"""
+    return _WORD_PATTERN.findall(text.lower())
+
+class EmotionLexicon:
+    """Token-indexed emotion lexicon.
+
+    Single-word terms live in a dict keyed by the word; multi-word terms are
+    indexed by their first word. Scoring a text is therefore one dict lookup
+    per token. The score of an emotion is the number of distinct lexicon terms
+    for that emotion found in the text, matched on whole words only.
+    """
+
+    def __init__(self, emotions=None):
+        self.emotions = []
+        self._term_emotions = defaultdict(list)
+        self._phrases = defaultdict(set)
+        self._fingerprint = None
+
+        if emotions is None:
+            emotions = DEFAULT_EMOTIONS
+        for emotion, terms in emotions.items():
+            self.add(emotion, terms)
+
+    def __len__(self):
+        return len(self._term_emotions)
+
+    def add(self, emotion, terms):
+        """Add terms (words or phrases) for an emotion"""
+        self._fingerprint = None
+        if emotion not in self.emotions:
+            self.emotions.append(emotion)
+        for term in terms:
+            words = tuple(tokenize_words(term))
+            if not words:
+                continue
+            key = ' '.join(words)
+            if emotion not in self._term_emotions[key]:
+                self._term_emotions[key].append(emotion)
+            if len(words) > 1:
+                self._phrases[words[0]].add(words)
+
+    def fingerprint(self):
+        """Stable hash of the lexicon contents, e.g. for cache keys"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            digest.update(json.dumps(self.emotions).encode('utf-8'))
+            for term in sorted(self._term_emotions):
+                digest.update(json.dumps([term, self._term_emotions[term]]).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def from_tables(cls, emotions, term_emotions, phrases, fingerprint=None):
+        """A lexicon over prebuilt term and phrase tables (see compiled_lexicon); don't add to it"""
+        lexicon = cls({})
+        lexicon.emotions = list(emotions)
+        lexicon._term_emotions = term_emotions
+        lexicon._phrases = phrases
+        lexicon._fingerprint = fingerprint
+        return lexicon
+
+    @classmethod
+    def from_file(cls, path, include_defaults=False):
+        """Load a lexicon from a file.
+
+        Supported formats are JSON (``{"emotion": ["term", ...]}``) and
+        tab- or comma-separated rows of ``term, emotion[, association]``.
+        The optional association column follows the NRC EmoLex word-level
+        layout: rows whose association is 0 are skipped. Lines starting with
+        '#' are ignored.
+        """
+        lexicon = cls() if include_defaults else cls({})
+
+        if path.lower().endswith('.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for emotion, terms in json.load(f).items():
+                    lexicon.add(emotion, terms)
+            return lexicon
+
+        grouped = defaultdict(list)
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            sample = f.readline()
+            f.seek(0)
+            delimiter = '\t' if '\t' in sample else ','
+            for row in csv.reader(f, delimiter=delimiter):
+                if not row or row[0].startswith('#') or len(row) < 2:
+                    continue
+                if len(row) > 2 and row[2].strip() in ('0', ''):
+                    continue
+                grouped[row[1].strip()].append(row[0])
+        for emotion, terms in grouped.items():
+            lexicon.add(emotion, terms)
+        return lexicon
+
+    def score(self, text=None, tokens=None):
+        """Return {emotion: score} for emotions present in the text.
+
+        Pass ``tokens`` (lowercase words) to reuse an existing tokenization.
+        """
+        if tokens is None:
+            tokens = tokenize_words(text)
+
+        term_emotions = self._term_emotions
+        phrases = self._phrases
+        matched = set()
+        for i, token in enumerate(tokens):
+            if token in term_emotions:
+                matched.add(token)
+            if token in phrases:
+                for phrase in phrases[token]:
+                    if tuple(tokens[i:i + len(phrase)]) == phrase:
+                        matched.add(' '.join(phrase))
+
+        counts = defaultdict(int)
+        for term in matched:
+            for emotion in term_emotions[term]:
+                counts[emotion] += 1
+
+        return {emotion: counts[emotion] for emotion in self.emotions if counts.get(emotion)}
+
+DEFAULT_LEXICON = EmotionLexicon()
+
+def analyze_emotions(text, lexicon=None, tokens=None):
+    """Score emotions in text with the given lexicon (default: built-in keywords)"""
+    if lexicon is None:
+        lexicon = DEFAULT_LEXICON
+    return lexicon.score(text, tokens=tokens)
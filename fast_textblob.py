@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Fast TextBlob-Compatible Scorer
+Reproduces TextBlob's default (pattern) polarity and subjectivity without
+building a TextBlob. The en-sentiment.xml lexicon shipped with TextBlob is
+loaded once into a flat word -> (polarity, subjectivity, intensity, modifier)
+table, and each text is tokenized and scored in a single pass with the same
+rules as pattern: intensifiers ("very good"), negation ("not good"),
+exclamation marks, the sarcasm mark (!) and emoticons.
+
+Run ``python fast_textblob.py --check`` to compare against TextBlob on the
+compatibility set.
+"""
+
+import argparse
+import os
+import re
+import sys
+from xml.etree import ElementTree
+
+from textblob import _text as pattern
+
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+MODIFIER_TAGS = ("RB",)
+
+# Tokenizer rules of pattern's find_tokens
+_REPLACEMENTS = dict(pattern.replacements)
+_LEADING = tuple(pattern.PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+_LEADING_CHARS = frozenset(_LEADING)
+_TRAILING_CHARS = frozenset(_TRAILING)
+_ABBREVIATIONS = frozenset(pattern.ABBREVIATIONS)
+_ABBREVIATION_PATTERNS = (pattern.RE_ABBR1, pattern.RE_ABBR2, pattern.RE_ABBR3)
+_QUOTES = str.maketrans({quote: f" {quote} " for quote in ("“", "”", "‘", "’", "'", '"')})
+_LINEBREAK = re.compile(r"\n{2,}")
+_EOS = pattern.EOS
+_SENTENCE_END = frozenset(("...", ".", "!", "?", _EOS))
+_SENTENCE_CLOSE = frozenset(("'", '"', "”", "’", "...", ".", "!", "?", ")", _EOS))
+
+# Emoticon scores, first matching expression wins as in pattern
+_EMOTICON_SCORES = {}
+for (_, _score), _expressions in pattern.EMOTICONS.items():
+    for _expression in _expressions:
+        _EMOTICON_SCORES.setdefault(_expression.lower(), _score)
+
+# pattern re-joins emoticons that tokenization split ("8 )" -> "8)"); that can
+# only change a text where two of their characters are separated by a space
+_EMOTICON_GAPS = re.compile("|".join(sorted({
+    re.escape(expression[k]) + " " + re.escape(expression[k + 1])
+    for expressions in pattern.EMOTICONS.values() for expression in expressions
+    for k in range(len(expression) - 1)
+})))
+# A standalone period inside an emoticon ("o . O") may be a sentence end, and
+# pattern never joins emoticons across sentences
+_EMOTICON_PERIOD = re.compile(r"[o>°] \. ")
+
+def _package_file(*parts):
+    """Path of a data file shipped with TextBlob"""
+    return os.path.join(os.path.dirname(os.path.abspath(pattern.__file__)), *parts)
+
+def _avg(values):
+    return sum(values) / float(len(values) or 1)
+
+def _split_punctuation(words):
+    """Split leading and trailing punctuation off each word like find_tokens"""
+    tokens = []
+    append = tokens.append
+    for t in words:
+        if t[0] not in _LEADING_CHARS and t[-1] not in _TRAILING_CHARS:
+            append(t)
+            continue
+        tail = []
+        while t.startswith(_LEADING) and t not in _REPLACEMENTS:
+            append(t[0])
+            t = t[1:]
+        while t.endswith(_TRAILING) and t not in _REPLACEMENTS:
+            if t.endswith(_LEADING):
+                tail.append(t[-1])
+                t = t[:-1]
+            if t.endswith("..."):
+                tail.append("...")
+                t = t[:-3].rstrip(".")
+            if t.endswith("."):
+                if t in _ABBREVIATIONS or any(regex.match(t) is not None for regex in _ABBREVIATION_PATTERNS):
+                    break
+                tail.append(t[-1])
+                t = t[:-1]
+        if t != "":
+            append(t)
+        tokens.extend(reversed(tail))
+    return tokens
+
+def _sentences(tokens):
+    """Group tokens into sentences exactly like find_tokens (end-of-paragraph markers dropped)"""
+    sentences, i, j = [[]], 0, 0
+    while j < len(tokens):
+        if tokens[j] in _SENTENCE_END:
+            while j < len(tokens) and tokens[j] in _SENTENCE_CLOSE:
+                if tokens[j] in ("'", '"') and sentences[-1].count(tokens[j]) % 2 == 0:
+                    break
+                j += 1
+            sentences[-1].extend(t for t in tokens[i:j] if t != _EOS)
+            sentences.append([])
+            i = j
+        j += 1
+    sentences[-1].extend(tokens[i:j])
+    return [" ".join(sentence) for sentence in sentences if sentence]
+
+def _join_emoticons(string):
+    if "!" in string and "(" in string:
+        string = pattern.RE_SARCASM.sub("(!)", string)
+    if _EMOTICON_GAPS.search(string) is not None:
+        string = pattern.RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), string)
+    return string
+
+def tokenize(text):
+    """Lowercase words of a text as pattern's sentiment sees them"""
+    for contraction, replacement in _REPLACEMENTS.items():
+        if contraction in text:
+            text = text.replace(contraction, replacement)
+    text = text.translate(_QUOTES)
+    if "\n\n" in text or "\r\n" in text:
+        text = _LINEBREAK.sub(f" {_EOS} ", text.replace("\r\n", "\n"))
+    words = text.split()
+    if not words:
+        return []
+    tokens = _split_punctuation(words)
+
+    joined = " ".join(tokens)
+    if _EOS in tokens or _EMOTICON_PERIOD.search(joined) is not None:
+        # Rare: emoticons and sentence ends interact, so go sentence by sentence
+        joined = " ".join(_join_emoticons(sentence) for sentence in _sentences(tokens))
+    else:
+        joined = _join_emoticons(joined)
+    return joined.lower().split()
+
+class FastTextBlob:
+    """Drop-in replacement for TextBlob(text).sentiment (the default PatternAnalyzer)"""
+
+    def __init__(self, lexicon_file=None, lexicon=None):
+        # word -> (polarity, subjectivity, intensity, is_modifier)
+        self.lexicon = lexicon if lexicon is not None else self._load_lexicon(
+            lexicon_file or _package_file('en', 'en-sentiment.xml'))
+
+    @staticmethod
+    def _load_lexicon(path):
+        """Compile en-sentiment.xml the way pattern's Sentiment.load does"""
+        words = {}
+        for element in ElementTree.parse(path).getroot().findall("word"):
+            form = element.attrib.get("form")
+            if form:
+                scores = (float(element.attrib.get("polarity", 0.0)),
+                          float(element.attrib.get("subjectivity", 0.0)),
+                          float(element.attrib.get("intensity", 1.0)))
+                words.setdefault(form, {}).setdefault(element.attrib.get("pos"), []).append(scores)
+        # Average the senses per part-of-speech tag, then over all tags
+        for form in words:
+            words[form] = {pos: [_avg(each) for each in zip(*senses)]
+                           for pos, senses in words[form].items()}
+        for form, tags in list(words.items()):
+            tags[None] = [_avg(each) for each in zip(*tags.values())]
+        # Adverbs derived from adjectives ("terrible" -> "terribly")
+        for form, tags in list(words.items()):
+            if "JJ" in tags:
+                if form.endswith("y"):
+                    form = form[:-1] + "i"
+                if form.endswith("le"):
+                    form = form[:-2]
+                adverb = words.setdefault(form + "ly", {})
+                adverb["RB"] = adverb[None] = tuple(tags["JJ"])
+        return {form: tuple(tags[None]) + (any(tag in tags for tag in MODIFIER_TAGS),)
+                for form, tags in words.items()}
+
+    def sentiment(self, text):
+        """(polarity, subjectivity) of a text, as TextBlob(text).sentiment"""
+        return self.score_tokens(tokenize(text))
+
+    def sentiment_many(self, texts):
+        """(polarity, subjectivity) for each of several texts"""
+        score_tokens = self.score_tokens
+        return [score_tokens(tokenize(text)) for text in texts]
+
+    def score_tokens(self, words):
+        """Score lowercase tokens (see tokenize) with pattern's assessment rules"""
+        lexicon = self.lexicon
+        # Assessments as [polarity, subjectivity, intensity, negated]
+        assessments = []
+        modifier = None
+        negation = None
+        for w in words:
+            entry = lexicon.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if modifier is None:
+                    assessments.append([p, s, i, False])
+                else:
+                    # "very good": the modifier's intensity scales the word
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * last[2], +1.0))
+                    last[1] = max(-1.0, min(s * last[2], +1.0))
+                    last[2] = i
+                if negation is not None:
+                    last = assessments[-1]
+                    last[2] = 1.0 / last[2]
+                    last[3] = True
+                modifier = w if is_modifier else None
+                negation = w if w in NEGATIONS else None
+                continue
+
+            if w in NEGATIONS:
+                negation = w
+            elif negation and len(w.strip("'")) > 1:
+                # Negation is kept across small words ("not a good")
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith("ly"):
+                # "really not good"
+                assessments[-1][3] = True
+                negation = None
+            elif modifier and len(w) > 2:
+                modifier = None
+            if w == "!" and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, +1.0))
+            if w == "(!)":
+                assessments.append([0.0, 1.0, 1.0, False])
+            score = _EMOTICON_SCORES.get(w)
+            if score is not None and w.isalpha() is False and len(w) <= 5 and w not in pattern.PUNCTUATION:
+                assessments.append([score, 1.0, 1.0, False])
+
+        # Plain running sums, as pattern averages them
+        polarity = subjectivity = 0
+        for p, s, _, negated in assessments:
+            polarity += p * -0.5 if negated else p
+            subjectivity += s
+        count = float(len(assessments) or 1)
+        return polarity / count, subjectivity / count
+
+COMPATIBILITY_SET = [
+    "The book was good.",
+    "The book was very good.",
+    "The book was not good.",
+    "The book was not very good.",
+    "The book was really not good.",
+    "It is not a good book.",
+    "Not bad at all!",
+    "What a great day!!!",
+    "I'm extremely happy, truly amazing!",
+    "This is terribly bad, horribly awful.",
+    "Oh great, another delay (!)",
+    "Oh great, another delay ( ! )",
+    "I love it :) but hate the price :(",
+    "Best. Day. Ever. XD xD :D :-) ;) <3",
+    "The ending :'( made me cry",
+    "see page 8) for details",
+    "o. O what was that",
+    "wow. o . O that was strange",
+    "Mr. Smith said the U.S. economy is e.g. fine... or is it?",
+    "He said \"this is 'quite' wonderful\" and left.",
+    "“Smart” quotes and ‘single’ ones aren’t a problem, are they?",
+    "First paragraph is lovely.\n\nSecond one is dreadful.\r\n\r\nThird: meh",
+    "I don't like it, I can't stand it, I won't buy it.",
+    "never happy, never sad",
+    "no good deed goes unpunished",
+    "",
+    "   ",
+    "!!!",
+    "a-very-long-hyphenated-word and #hashtags @mentions http://example.com/path?x=1",
+    "The quarterly report indicates satisfactory performance with room for improvement.",
+    "OMG! Just got my new phone and it's 🔥🔥🔥! The camera is insane and the battery life is amazing.",
+]
+
+def compatibility_texts():
+    """The compatibility set plus the long texts in sample_texts.txt and synthetic reviews"""
+    texts = list(COMPATIBILITY_SET)
+    sample_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_texts.txt')
+    if os.path.exists(sample_file):
+        from benchmark import load_sample_texts, synthetic_corpus
+        samples = load_sample_texts(sample_file)
+        texts.extend(samples)
+        texts.extend(sentence.strip() for sample in samples for sentence in sample.split('.'))
+        texts.extend(synthetic_corpus(500, 30, seed=1))
+    return texts
+
+def check_equivalence(texts=None, scorer=None):
+    """Compare FastTextBlob with TextBlob, returning the mismatches"""
+    from textblob import TextBlob
+    texts = compatibility_texts() if texts is None else texts
+    scorer = scorer or FastTextBlob()
+    mismatches = []
+    for text in texts:
+        expected = tuple(TextBlob(text).sentiment)
+        actual = scorer.sentiment(text)
+        if expected != actual:
+            mismatches.append((text, expected, actual))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast TextBlob-compatible scorer")
+    parser.add_argument('--check', action='store_true',
+                        help='Compare against TextBlob on the compatibility set')
+    parser.add_argument('text', nargs='?', help='Text to score')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        texts = compatibility_texts()
+        mismatches = check_equivalence(texts)
+        for text, expected, actual in mismatches[:20]:
+            print(f"MISMATCH: {text[:60]!r}\n  textblob: {expected}\n  fast:     {actual}")
+        print(f"{len(texts) - len(mismatches)}/{len(texts)} texts match TextBlob's scores")
+        sys.exit(1 if mismatches else 0)
+    if args.text is None:
+        parser.error('give a text to score or --check')
+    polarity, subjectivity = FastTextBlob().sentiment(args.text)
+    print({'polarity': polarity, 'subjectivity': subjectivity})
+
+if __name__ == '__main__':
+    main()
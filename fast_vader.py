@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Fast VADER-Compatible Scorer
+Reproduces vaderSentiment's polarity_scores (compound/pos/neu/neg) with the
+lexicon, boosters and negations compiled into flat lookup tables. Each text
+is lowercased once and scored in a single pass over its tokens, instead of
+re-lowercasing the whole sentence for every negation and idiom check.
+
+Run ``python fast_vader.py --check`` to compare against the reference
+implementation on the compatibility set.
+"""
+
+import argparse
+import math
+import os
+import string
+import sys
+
+from vaderSentiment import vaderSentiment as reference
+
+B_INCR = reference.B_INCR
+C_INCR = reference.C_INCR
+N_SCALAR = reference.N_SCALAR
+
+BOOSTERS = dict(reference.BOOSTER_DICT)
+NEGATIONS = frozenset(reference.NEGATE)
+SPECIAL_CASES = dict(reference.SPECIAL_CASES)
+
+# Any special case or multi-word booster needs all of its words in this set,
+# so the idiom checks are skipped when none of the nearby words are in it
+_IDIOM_WORDS = frozenset(
+    word for phrase in list(SPECIAL_CASES) + [b for b in BOOSTERS if ' ' in b] for word in phrase.split()
+)
+
+_PUNCTUATION = string.punctuation
+
+def _package_file(name):
+    """Path of a data file shipped with vaderSentiment"""
+    return os.path.join(os.path.dirname(os.path.abspath(reference.__file__)), name)
+
+def _is_negation(word):
+    """Same test as vaderSentiment.negated() for a single lowercase word"""
+    return word in NEGATIONS or "n't" in word
+
+class FastVader:
+    """Drop-in replacement for SentimentIntensityAnalyzer.polarity_scores"""
+
+    def __init__(self, lexicon_file=None, emoji_lexicon=None, lexicon=None, emojis=None):
+        self.lexicon = lexicon if lexicon is not None else self._load_lexicon(
+            lexicon_file or _package_file('vader_lexicon.txt'))
+        self.emojis = emojis if emojis is not None else self._load_emojis(
+            emoji_lexicon or _package_file('emoji_utf8_lexicon.txt'))
+        # Only single-character keys can match: the reference replaces emojis
+        # one character at a time
+        self._emoji_chars = frozenset(key for key in self.emojis if len(key) == 1)
+        self._least_in_lexicon = 'least' in self.lexicon
+
+    @staticmethod
+    def _load_lexicon(path):
+        lexicon = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f.read().rstrip('\n').split('\n'):
+                if not line:
+                    continue
+                word, measure = line.strip().split('\t')[0:2]
+                lexicon[word] = float(measure)
+        return lexicon
+
+    @staticmethod
+    def _load_emojis(path):
+        emojis = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f.read().rstrip('\n').split('\n'):
+                emoji, description = line.strip().split('\t')[0:2]
+                emojis[emoji] = description
+        return emojis
+
+    def _replace_emojis(self, text):
+        """Replace emojis by their descriptions exactly like the reference"""
+        if text.isascii() or self._emoji_chars.isdisjoint(text):
+            return text.strip()
+        emojis = self.emojis
+        parts = []
+        prev_space = True
+        for ch in text:
+            if ch in emojis:
+                if not prev_space:
+                    parts.append(' ')
+                parts.append(emojis[ch])
+                prev_space = False
+            else:
+                parts.append(ch)
+                prev_space = ch == ' '
+        return ''.join(parts).strip()
+
+    def polarity_scores(self, text):
+        """Return {'neg', 'neu', 'pos', 'compound'} exactly as VADER does"""
+        text = self._replace_emojis(text)
+
+        tokens = []
+        for token in text.split():
+            stripped = token.strip(_PUNCTUATION)
+            tokens.append(token if len(stripped) <= 2 else stripped)
+        lowers = [token.lower() for token in tokens]
+        n = len(tokens)
+
+        allcaps = sum(1 for token in tokens if token.isupper())
+        is_cap_diff = 0 < n - allcaps < n
+
+        # One lexicon lookup per token; None for words not in the lexicon
+        get = self.lexicon.get
+        valences = [get(lower) for lower in lowers]
+        sentiments = []
+        append = sentiments.append
+        for i in range(n):
+            lower = lowers[i]
+            if lower in BOOSTERS:
+                append(0)
+            elif i < n - 1 and lower == "kind" and lowers[i + 1] == "of":
+                append(0)
+            elif valences[i] is not None:
+                append(self._valence(i, tokens, lowers, valences, n, is_cap_diff))
+            else:
+                append(0)
+
+        if 'but' in lowers:
+            sentiments = self._but_check(lowers.index('but'), sentiments)
+        return self._score_valence(sentiments, text)
+
+    def polarity_scores_many(self, texts):
+        """Score many texts, returning a list of polarity_scores dicts"""
+        score = self.polarity_scores
+        return [score(text) for text in texts]
+
+    def _valence(self, i, tokens, lowers, valences, n, is_cap_diff):
+        """Valence of the lexicon word at position i with all of VADER's rules"""
+        lower = lowers[i]
+        valence = valences[i]
+
+        if lower == "no" and i != n - 1 and valences[i + 1] is not None:
+            valence = 0.0
+        if (i > 0 and lowers[i - 1] == "no") \
+                or (i > 1 and lowers[i - 2] == "no") \
+                or (i > 2 and lowers[i - 3] == "no" and lowers[i - 1] in ("or", "nor")):
+            valence = valences[i] * N_SCALAR
+
+        if is_cap_diff and tokens[i].isupper():
+            if valence > 0:
+                valence += C_INCR
+            else:
+                valence -= C_INCR
+
+        for start_i in range(0, 3):
+            j = i - (start_i + 1)
+            if j < 0 or valences[j] is not None:
+                continue
+
+            # Booster / dampener on the preceding word
+            s = 0.0
+            booster = BOOSTERS.get(lowers[j])
+            if booster is not None:
+                s = booster
+                if valence < 0:
+                    s *= -1
+                if is_cap_diff and tokens[j].isupper():
+                    if valence > 0:
+                        s += C_INCR
+                    else:
+                        s -= C_INCR
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+            valence = valence + s
+
+            # Negation within three words
+            if start_i == 0:
+                if _is_negation(lowers[i - 1]):
+                    valence = valence * N_SCALAR
+            elif start_i == 1:
+                if lowers[i - 2] == "never" and lowers[i - 1] in ("so", "this"):
+                    valence = valence * 1.25
+                elif lowers[i - 2] == "without" and lowers[i - 1] == "doubt":
+                    pass
+                elif _is_negation(lowers[i - 2]):
+                    valence = valence * N_SCALAR
+            else:
+                if (lowers[i - 3] == "never" and lowers[i - 2] in ("so", "this")) \
+                        or lowers[i - 1] in ("so", "this"):
+                    valence = valence * 1.25
+                elif lowers[i - 3] == "without" and (lowers[i - 2] == "doubt" or lowers[i - 1] == "doubt"):
+                    pass
+                elif _is_negation(lowers[i - 3]):
+                    valence = valence * N_SCALAR
+                valence = self._special_idioms(valence, lowers, i, n)
+
+        # "least" flips the valence unless it is "at least" / "very least"
+        if not self._least_in_lexicon and i > 0 and lowers[i - 1] == "least":
+            if i > 1:
+                if lowers[i - 2] != "at" and lowers[i - 2] != "very":
+                    valence = valence * N_SCALAR
+            else:
+                valence = valence * N_SCALAR
+        return valence
+
+    @staticmethod
+    def _special_idioms(valence, lowers, i, n):
+        """Special-case phrases and multi-word boosters around position i (i >= 3)"""
+        window = lowers[i - 3:i + 3]
+        if not any(word in _IDIOM_WORDS for word in window):
+            return valence
+
+        onezero = f"{lowers[i - 1]} {lowers[i]}"
+        twoonezero = f"{lowers[i - 2]} {lowers[i - 1]} {lowers[i]}"
+        twoone = f"{lowers[i - 2]} {lowers[i - 1]}"
+        threetwoone = f"{lowers[i - 3]} {lowers[i - 2]} {lowers[i - 1]}"
+        threetwo = f"{lowers[i - 3]} {lowers[i - 2]}"
+
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+        if n - 1 > i:
+            zeroone = f"{lowers[i]} {lowers[i + 1]}"
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if n - 1 > i + 1:
+            zeroonetwo = f"{lowers[i]} {lowers[i + 1]} {lowers[i + 2]}"
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in BOOSTERS:
+                valence = valence + BOOSTERS[n_gram]
+        return valence
+
+    @staticmethod
+    def _but_check(bi, sentiments):
+        """Dampen sentiment before the first 'but' and boost it after.
+
+        Mirrors the reference loop exactly, including its lookup of each value's
+        first index in the partially updated list.
+        """
+        for sentiment in sentiments:
+            si = sentiments.index(sentiment)
+            if si < bi:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 0.5)
+            elif si > bi:
+                sentiments.pop(si)
+                sentiments.insert(si, sentiment * 1.5)
+        return sentiments
+
+    @staticmethod
+    def _score_valence(sentiments, text):
+        if sentiments:
+            sum_s = float(sum(sentiments))
+
+            ep_count = min(text.count("!"), 4)
+            qm_count = text.count("?")
+            qm_amplifier = 0
+            if qm_count > 1:
+                qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+            punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+            if sum_s > 0:
+                sum_s += punct_emph_amplifier
+            elif sum_s < 0:
+                sum_s -= punct_emph_amplifier
+
+            compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+            compound = max(-1.0, min(1.0, compound))
+
+            pos_sum = 0.0
+            neg_sum = 0.0
+            neu_count = 0
+            for sentiment_score in sentiments:
+                if sentiment_score > 0:
+                    pos_sum += (float(sentiment_score) + 1)
+                if sentiment_score < 0:
+                    neg_sum += (float(sentiment_score) - 1)
+                if sentiment_score == 0:
+                    neu_count += 1
+
+            if pos_sum > math.fabs(neg_sum):
+                pos_sum += punct_emph_amplifier
+            elif pos_sum < math.fabs(neg_sum):
+                neg_sum -= punct_emph_amplifier
+
+            total = pos_sum + math.fabs(neg_sum) + neu_count
+            pos = math.fabs(pos_sum / total)
+            neg = math.fabs(neg_sum / total)
+            neu = math.fabs(neu_count / total)
+        else:
+            compound = 0.0
+            pos = 0.0
+            neg = 0.0
+            neu = 0.0
+
+        return {
+            "neg": round(neg, 3),
+            "neu": round(neu, 3),
+            "pos": round(pos, 3),
+            "compound": round(compound, 4)
+        }
+
+# Sentences exercising VADER's rules: the examples from vaderSentiment itself
+# plus negation, boosters, caps, "but", idioms, "least", "no", punctuation and emoji
+COMPATIBILITY_SET = [
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was good.",
+    "At least it isn't a horrible book.",
+    "The book was only kind of good.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today SUX!",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Not bad at all",
+    "I was never so happy in my life.",
+    "Without doubt this is the best day.",
+    "This is the least helpful answer, at least for me.",
+    "The very least you could do is not be rude.",
+    "No good deed goes unpunished; no, no, no.",
+    "There is no love or respect here.",
+    "That movie was the bomb, to die for, the shit!",
+    "Yeah right, like that bus stop was a beating heart of the city.",
+    "It was sort of good but kind of bad but mostly great.",
+    "good good good but bad bad bad",
+    "Are you serious?? Really??? This is awful????",
+    "I HATE this. I hate THIS. i hate this!!!!!",
+    "",
+    "   ",
+    "🔥🔥🔥 amazing 😍",
+    "He just barely passed, which is hardly impressive but somewhat okay.",
+    "The service wasn't great, didn't care, won't return.",
+    "I can't stand how slow it is, totally fed up.",
+    "Absolutely, completely, utterly DISAPPOINTED but still hopeful.",
+]
+
+def compatibility_texts():
+    """The compatibility set plus the long texts in sample_texts.txt"""
+    texts = list(COMPATIBILITY_SET)
+    sample_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sample_texts.txt')
+    if os.path.exists(sample_file):
+        from benchmark import load_sample_texts, synthetic_corpus
+        samples = load_sample_texts(sample_file)
+        texts.extend(samples)
+        # Individual sentences of the samples, so "but" and caps are seen in short texts too
+        texts.extend(sentence.strip() for sample in samples for sentence in sample.split('.'))
+        texts.extend(synthetic_corpus(500, 30, seed=1))
+    return texts
+
+def check_equivalence(texts=None, scorer=None):
+    """Compare FastVader with the reference analyzer, returning the mismatches"""
+    texts = compatibility_texts() if texts is None else texts
+    scorer = scorer or FastVader()
+    reference_analyzer = reference.SentimentIntensityAnalyzer()
+    mismatches = []
+    for text in texts:
+        expected = reference_analyzer.polarity_scores(text)
+        actual = scorer.polarity_scores(text)
+        if expected != actual:
+            mismatches.append((text, expected, actual))
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast VADER-compatible scorer")
+    parser.add_argument('--check', action='store_true',
+                        help='Compare against the reference VADER on the compatibility set')
+    parser.add_argument('text', nargs='?', help='Text to score')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        texts = compatibility_texts()
+        mismatches = check_equivalence(texts)
+        for text, expected, actual in mismatches[:20]:
+            print(f"MISMATCH: {text[:60]!r}\n  reference: {expected}\n  fast:      {actual}")
+        print(f"{len(texts) - len(mismatches)}/{len(texts)} texts match the reference VADER scores")
+        sys.exit(1 if mismatches else 0)
+    if args.text is None:
+        parser.error('give a text to score or --check')
+    print(FastVader().polarity_scores(args.text))
+
+if __name__ == '__main__':
+    main()
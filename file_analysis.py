@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+File Analysis
+Analyzes a folder of text files or a CSV/JSONL/text file of documents on a
+process pool, keeping running aggregates (label counts, mean scores, emotion
+totals) that can be shown while the run is still going. Used by the GUI's
+"Analyze Files" mode; progress is reported through a callback and a run can
+be cancelled from another thread.
+"""
+
+import csv
+import os
+import time
+from collections import Counter, deque
+from cli_sentiment_analysis import analyze_many, iter_input_texts
+from sentiment_engine import vader_label, textblob_label
+
+FOLDER_EXTENSIONS = ('.txt',)
+
+def input_format_for(path):
+    """Batch input format of a file, by extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'lines'
+
+def list_folder(folder, extensions=FOLDER_EXTENSIONS):
+    """Paths of the documents under ``folder``, recursively and sorted"""
+    paths = []
+    for directory, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(extensions):
+                paths.append(os.path.join(directory, name))
+    return sorted(paths)
+
+def iter_folder_texts(folder, paths=None):
+    """Yield (relative path, text) for every non-empty document in a folder"""
+    for path in paths if paths is not None else list_folder(folder):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read().strip()
+        if text:
+            yield os.path.relpath(path, folder), text
+
+def iter_file_texts(path, input_format=None, text_field='text'):
+    """Yield (record_id, text) from a CSV, JSONL or one-text-per-line file"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from iter_input_texts(f, input_format or input_format_for(path), text_field)
+
+def count_records(path, input_format):
+    """Number of records in a batch input file (for progress), read without parsing texts"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if input_format == 'csv':
+            return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+        return sum(1 for line in f if line.strip())
+
+def csv_columns(path):
+    """Header of a CSV file"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f), [])
+
+class BatchSummary:
+    """Running aggregates over analyze_text results"""
+
+    def __init__(self):
+        self.documents = 0
+        self.labels = Counter()
+        self.emotions = Counter()
+        self._sums = Counter()
+        self._counts = Counter()
+
+    def add(self, result):
+        self.documents += 1
+        for method, keys in (('vader', ('compound', 'positive', 'neutral', 'negative')),
+                             ('textblob', ('polarity', 'subjectivity'))):
+            scores = result.get(method)
+            if scores is None:
+                continue
+            for key in keys:
+                self._sums[(method, key)] += scores[key]
+            self._counts[method] += 1
+        # One label per document: VADER's if it was run, else TextBlob's
+        primary = result.get('vader') or result.get('textblob')
+        if primary is not None:
+            self.labels[primary['sentiment']] += 1
+        self.emotions.update(result.get('emotions', {}))
+        statistics = result.get('statistics')
+        if statistics is not None:
+            self._sums['words'] += statistics['total_words']
+            self._sums['sentences'] += statistics['sentences']
+
+    def mean(self, method, key):
+        count = self._counts[method]
+        return self._sums[(method, key)] / count if count else None
+
+    def to_gui_results(self):
+        """Aggregates in the GUI's result layout (mean scores, emotion totals)"""
+        results = {}
+        if self._counts['vader']:
+            compound = self.mean('vader', 'compound')
+            results["VADER"] = {
+                "sentiment": vader_label(compound),
+                "scores": {'neg': self.mean('vader', 'negative'), 'neu': self.mean('vader', 'neutral'),
+                           'pos': self.mean('vader', 'positive'), 'compound': compound},
+                "compound": compound
+            }
+        if self._counts['textblob']:
+            polarity = self.mean('textblob', 'polarity')
+            results["TextBlob"] = {
+                "sentiment": textblob_label(polarity),
+                "polarity": polarity,
+                "subjectivity": self.mean('textblob', 'subjectivity')
+            }
+        results["Emotions"] = dict(self.emotions.most_common())
+        return results
+
+    def to_dict(self):
+        return {
+            'documents': self.documents,
+            'labels': dict(self.labels),
+            'mean_vader_compound': self.mean('vader', 'compound'),
+            'mean_textblob_polarity': self.mean('textblob', 'polarity'),
+            'emotions': dict(self.emotions.most_common()),
+            'total_words': self._sums['words'],
+            'total_sentences': self._sums['sentences']
+        }
+
+def run_file_analysis(records, method='both', workers=None, chunksize=16, exporter=None,
+                      cancel=None, progress=None, progress_interval=0.2):
+    """Analyze (record_id, text) pairs on a process pool, returning (summary, cancelled).
+
+    Per-document results are written to ``exporter`` (see result_exporters)
+    if given. ``progress(summary)`` is called at most every ``progress_interval``
+    seconds and once at the end. Setting the ``cancel`` event stops the run
+    after the current result; the pool is terminated rather than drained.
+    """
+    summary = BatchSummary()
+    # Records waiting for their result; bounded by the chunks analyze_many keeps in flight
+    in_flight = deque()
+
+    def texts():
+        for record in records:
+            in_flight.append(record)
+            yield record[1]
+
+    results = analyze_many(texts(), method=method, workers=workers, chunksize=chunksize)
+    cancelled = False
+    last_report = time.monotonic()
+    try:
+        for result in results:
+            record_id, text = in_flight.popleft()
+            if exporter is not None:
+                exporter.write(record_id, text, method, result)
+            summary.add(result)
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            if progress is not None and time.monotonic() - last_report >= progress_interval:
+                last_report = time.monotonic()
+                progress(summary)
+    finally:
+        # Closing the generator exits analyze_many's pool, terminating the workers
+        results.close()
+        if exporter is not None:
+            exporter.flush()
+    if progress is not None:
+        progress(summary)
+    return summary, cancelled
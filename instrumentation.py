@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Instrumentation for the Analysis Pipeline
+Per-stage timers, counters and document-size histograms for
+CLISentimentAnalyzer, with optional cProfile / tracemalloc sampling of 1 in N
+calls. Metrics export as Prometheus text format or JSON. When an analyzer has
+no Instrumentation attached, none of this code runs.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+CHARS_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000, 100000)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus semantics"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + [float('inf')], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {('+Inf' if bound == float('inf') else repr(bound)): count
+                        for bound, count in self.cumulative()}
+        }
+
+class Instrumentation:
+    """Collects pipeline metrics for an analyzer.
+
+    Attach with ``CLISentimentAnalyzer(instrumentation=Instrumentation())``.
+    ``profile_every=N`` runs every Nth analysis under cProfile and
+    ``trace_memory_every=N`` records the tracemalloc peak of every Nth
+    analysis; both are off by default because they slow the sampled calls.
+    """
+
+    def __init__(self, profile_every=0, trace_memory_every=0):
+        self.profile_every = profile_every
+        self.trace_memory_every = trace_memory_every
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear all collected metrics"""
+        with self._lock:
+            self.documents = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.stage_seconds = defaultdict(lambda: Histogram(SECONDS_BUCKETS))
+            self.analysis_seconds = defaultdict(lambda: Histogram(SECONDS_BUCKETS))
+            self.document_chars = Histogram(CHARS_BUCKETS)
+            self.memory_peak_bytes = Histogram(BYTES_BUCKETS)
+            self.profiled_calls = 0
+            self._calls = 0
+            self._profile_stats = None
+
+    def timed(self, stage, func, *args):
+        """Call ``func(*args)`` and record its duration under ``stage``"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            with self._lock:
+                self.errors[stage] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stage_seconds[stage].observe(elapsed)
+
+    def analyze(self, method, text, func, *args):
+        """Run a whole analysis, counting it and sampling profiles when due"""
+        with self._lock:
+            self._calls += 1
+            calls = self._calls
+            self.documents[method] += 1
+            self.document_chars.observe(len(text))
+        profile = self.profile_every and calls % self.profile_every == 0
+        trace = self.trace_memory_every and calls % self.trace_memory_every == 0
+
+        profiler = cProfile.Profile() if profile else None
+        started_tracing = trace and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace:
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                return profiler.runcall(func, *args)
+            return func(*args)
+        except Exception:
+            with self._lock:
+                self.errors['analysis'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+            if started_tracing:
+                tracemalloc.stop()
+            with self._lock:
+                self.analysis_seconds[method].observe(elapsed)
+                if peak is not None:
+                    self.memory_peak_bytes.observe(peak)
+                if profiler is not None:
+                    self.profiled_calls += 1
+                    if self._profile_stats is None:
+                        self._profile_stats = pstats.Stats(profiler)
+                    else:
+                        self._profile_stats.add(profiler)
+
+    def profile_report(self, limit=25, sort='cumulative'):
+        """Top functions of all sampled cProfile runs, as text"""
+        with self._lock:
+            if self._profile_stats is None:
+                return "No profiled calls (set profile_every to sample with cProfile)."
+            stream = io.StringIO()
+            self._profile_stats.stream = stream
+            self._profile_stats.sort_stats(sort).print_stats(limit)
+            return stream.getvalue()
+
+    def to_dict(self):
+        """All metrics as plain data"""
+        with self._lock:
+            return {
+                'documents': dict(self.documents),
+                'errors': dict(self.errors),
+                'analysis_seconds': {m: h.to_dict() for m, h in self.analysis_seconds.items()},
+                'stage_seconds': {s: h.to_dict() for s, h in self.stage_seconds.items()},
+                'document_chars': self.document_chars.to_dict(),
+                'memory_peak_bytes': self.memory_peak_bytes.to_dict(),
+                'profiled_calls': self.profiled_calls
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix='sentiment'):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+
+        def counter(name, help_text, values, label):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+        def histogram(name, help_text, histograms, label=None):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, hist in sorted(histograms.items()):
+                labels = f'{label}="{key}",' if label else ''
+                for bound, count in hist.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_{name}_bucket{{{labels}le="{le}"}} {count}')
+                suffix = f'{{{labels.rstrip(",")}}}' if label else ''
+                lines.append(f"{prefix}_{name}_sum{suffix} {hist.sum}")
+                lines.append(f"{prefix}_{name}_count{suffix} {hist.count}")
+
+        with self._lock:
+            counter('documents_total', 'Documents analyzed', self.documents, 'method')
+            counter('errors_total', 'Failed stages or analyses', self.errors, 'stage')
+            histogram('analysis_seconds', 'End-to-end analysis time', self.analysis_seconds, 'method')
+            histogram('stage_seconds', 'Time spent per pipeline stage', self.stage_seconds, 'stage')
+            histogram('document_chars', 'Document size in characters', {'': self.document_chars})
+            if self.memory_peak_bytes.count:
+                histogram('memory_peak_bytes', 'tracemalloc peak of sampled analyses',
+                          {'': self.memory_peak_bytes})
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write metrics to ``path``: JSON for .json files, Prometheus text otherwise"""
+        content = self.to_json() if path.lower().endswith('.json') else self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection
+Optional pre-scoring stage for batch runs. Templated complaints and
+copy-pasted reviews that differ only in a name, an order number or
+whitespace are clustered in one streaming pass with MinHash signatures and
+banded LSH: only the first document of a cluster (its representative) is
+scored, and the others reuse its result together with their estimated
+similarity to it.
+
+    python cli_sentiment_analysis.py --batch reviews.txt --near-duplicates 0.8
+"""
+
+import re
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+# Estimated Jaccard similarity of word shingles at which a document reuses a result
+DEFAULT_THRESHOLD = 0.8
+
+# Words per shingle; with pairs, changing one word changes at most two shingles
+SHINGLE_SIZE = 2
+
+# Signature length and LSH bands (rows per band = NUM_PERM / BANDS). With 32
+# bands of 4 rows, pairs at similarity 0.8 share a band with probability
+# above 0.999; every candidate is then checked against the threshold.
+NUM_PERM = 128
+BANDS = 32
+
+# Representatives kept for matching (with their results); older ones are forgotten
+MAX_REPRESENTATIVES = 10000
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_PATTERN = re.compile(r"\w+")
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+def shingles(text, size=SHINGLE_SIZE):
+    """CRC-32 hashes of the lowercase word n-grams of a text.
+
+    Runs of digits count as the same word, so order numbers and dates don't
+    make copies of a template look different. Texts shorter than ``size``
+    words give one shingle of all their words.
+    """
+    words = _WORD_PATTERN.findall(_DIGITS_PATTERN.sub('0', text.lower()))
+    if len(words) <= size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {zlib.crc32(gram.encode('utf-8')) for gram in grams}
+
+class NearDuplicateIndex:
+    """Streaming near-duplicate clustering over MinHash signatures.
+
+    ``match(text, item)`` returns ``(representative item, similarity)`` when
+    the text is a near duplicate of a representative seen before. Otherwise
+    it returns None and the text becomes a representative, remembered with
+    ``item``. The ``max_representatives`` most recently matched or added
+    representatives are kept.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_representatives=MAX_REPRESENTATIVES,
+                 num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE, seed=1):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_representatives = max_representatives
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Universal hashes (a * x + b) mod p with a, b and x below p = 2**31 - 1,
+        # so a * x + b fits in uint64 without wrapping
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        # id -> (signature, band keys, item), least recently used first
+        self._representatives = OrderedDict()
+        # One dict per band: band key -> representative id
+        self._buckets = [{} for _ in range(bands)]
+        self._next_id = 0
+
+        self.documents = 0
+        self.duplicates = 0
+
+    def signature(self, text):
+        """MinHash signature of a text (uint64 array), or None if it has no words"""
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return None
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes)) % _MERSENNE_PRIME
+        return ((self._a * x + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def match(self, text, item=None):
+        """Find the representative ``text`` is a near duplicate of, or make it one"""
+        self.documents += 1
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        rows = self.rows
+        band_keys = [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+        candidates = {bucket[key] for bucket, key in zip(self._buckets, band_keys) if key in bucket}
+        best_id, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = float(np.count_nonzero(self._representatives[candidate][0] == signature)) / self.num_perm
+            if similarity > best_similarity:
+                best_id, best_similarity = candidate, similarity
+        if best_id is not None and best_similarity >= self.threshold:
+            self.duplicates += 1
+            self._representatives.move_to_end(best_id)
+            return self._representatives[best_id][2], best_similarity
+
+        representative_id = self._next_id
+        self._next_id += 1
+        self._representatives[representative_id] = (signature, band_keys, item)
+        for bucket, key in zip(self._buckets, band_keys):
+            bucket.setdefault(key, representative_id)
+        if len(self._representatives) > self.max_representatives:
+            self._forget_oldest()
+        return None
+
+    def _forget_oldest(self):
+        representative_id, (_, band_keys, _) = self._representatives.popitem(last=False)
+        for bucket, key in zip(self._buckets, band_keys):
+            if bucket.get(key) == representative_id:
+                del bucket[key]
+
+    def stats(self):
+        """Document and duplicate counters"""
+        return {
+            'documents': self.documents,
+            'duplicates': self.duplicates,
+            'scored': self.documents - self.duplicates,
+            'representatives': len(self._representatives)
+        }
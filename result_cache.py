@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Result Cache
+Content-addressed cache for analysis results. Keys are a hash of the
+normalized text, the analysis method and the analyzer versions, so repeated
+texts are only analyzed once. An in-memory LRU tier can be backed by an
+SQLite file that survives across runs.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from importlib import metadata
+
+# Bump when the shape or meaning of cached results changes
+CACHE_FORMAT_VERSION = 2
+
+def _library_versions():
+    """Versions of the libraries whose output ends up in the results"""
+    versions = []
+    for distribution in ('vaderSentiment', 'textblob', 'nltk'):
+        try:
+            versions.append(f"{distribution}={metadata.version(distribution)}")
+        except metadata.PackageNotFoundError:
+            versions.append(f"{distribution}=?")
+    return ';'.join(versions)
+
+def normalize_text(text):
+    """Normalize unicode and whitespace so trivially different copies share a key"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+class ResultCache:
+    """Bounded LRU cache of analysis results with an optional SQLite tier.
+
+    Results are stored as JSON, so every hit returns a fresh copy that the
+    caller may modify freely. ``stats()`` reports hit and miss counters for
+    sizing the cache.
+    """
+
+    def __init__(self, max_size=10000, db_path=None, commit_every=500):
+        self.max_size = max_size
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Read from package metadata on first use; not every analyzer needs a key
+        self._versions = None
+        self._uncommitted = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def make_key(self, text, method, namespace=''):
+        """Build the cache key for a text analyzed with ``method``"""
+        if self._versions is None:
+            self._versions = f"{CACHE_FORMAT_VERSION};{_library_versions()}"
+        payload = '\x00'.join((self._versions, namespace, method, normalize_text(text)))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached result for ``key`` or None"""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(value)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return json.loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        """Store a result under ``key``"""
+        value = json.dumps(result)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, value))
+                self._uncommitted += 1
+                if self._uncommitted >= self.commit_every:
+                    self._db.commit()
+                    self._uncommitted = 0
+
+    def _remember(self, key, value):
+        """Insert into the memory tier, evicting least recently used entries"""
+        if self.max_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'max_size': self.max_size
+        }
+
+    def flush(self):
+        """Commit pending writes to the disk tier"""
+        with self._lock:
+            if self._db is not None and self._uncommitted:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def close(self):
+        """Flush and close the disk tier"""
+        self.flush()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
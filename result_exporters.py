@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Result Exporters
+Streaming writers for analysis results: JSON lines (the batch format), CSV
+and Parquet. Results are written as they are produced through a write
+buffer, optionally gzip or zstd compressed, so exporting a run of any size
+never holds more than one buffer (or one Parquet row group) in memory.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+
+EXPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+_FORMAT_EXTENSIONS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl',
+                      '.csv': 'csv', '.parquet': 'parquet'}
+_COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# Characters collected before a write to a file the exporter opened
+FILE_BUFFER_SIZE = 1 << 20
+
+# Flat columns of the CSV and Parquet formats: (column, results section, key)
+FLAT_COLUMNS = [
+    ('vader_sentiment', 'vader', 'sentiment'),
+    ('vader_compound', 'vader', 'compound'),
+    ('vader_positive', 'vader', 'positive'),
+    ('vader_neutral', 'vader', 'neutral'),
+    ('vader_negative', 'vader', 'negative'),
+    ('textblob_sentiment', 'textblob', 'sentiment'),
+    ('textblob_polarity', 'textblob', 'polarity'),
+    ('textblob_subjectivity', 'textblob', 'subjectivity'),
+    ('total_words', 'statistics', 'total_words'),
+    ('filtered_words', 'statistics', 'filtered_words'),
+    ('sentences', 'statistics', 'sentences'),
+    ('avg_word_length', 'statistics', 'avg_word_length')
+]
+# Filled for texts that reused a near duplicate's result (see near_duplicates)
+DUPLICATE_COLUMNS = ['duplicate_of', 'duplicate_similarity']
+# Filled by --method cascade: the final label and the tiers that ran, joined with '+'
+CASCADE_COLUMNS = ['cascade_sentiment', 'cascade_tiers']
+COLUMNS = (['id', 'text', 'method'] + [column for column, _, _ in FLAT_COLUMNS] + ['emotions']
+           + DUPLICATE_COLUMNS + CASCADE_COLUMNS)
+
+def detect_format(path, default='jsonl'):
+    """(format, compression) implied by a file name such as results.csv.gz"""
+    if not path or path == '-':
+        return default, 'none'
+    root, extension = os.path.splitext(path.lower())
+    compression = _COMPRESSION_EXTENSIONS.get(extension, 'none')
+    if compression != 'none':
+        extension = os.path.splitext(root)[1]
+    return _FORMAT_EXTENSIONS.get(extension, default), compression
+
+def flatten_result(record_id, text, method, results):
+    """One row of the flat formats; emotions are a JSON object string"""
+    row = {'id': record_id, 'text': text, 'method': method}
+    for column, section, key in FLAT_COLUMNS:
+        row[column] = results.get(section, {}).get(key)
+    row['emotions'] = json.dumps(results.get('emotions', {}))
+    duplicate = results.get('duplicate', {})
+    row['duplicate_of'] = duplicate.get('of')
+    row['duplicate_similarity'] = duplicate.get('similarity')
+    cascade = results.get('cascade')
+    row['cascade_sentiment'] = cascade['sentiment'] if cascade else None
+    row['cascade_tiers'] = '+'.join(cascade['tiers']) if cascade else None
+    return row
+
+def open_compressed(path, compression='none'):
+    """Open ``path`` for binary writing through the given compression"""
+    if compression == 'gzip':
+        # Level 6 is close to level 9's size at a fraction of its CPU cost
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd compression requires zstandard: pip install zstandard") from e
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    if compression != 'none':
+        raise ValueError(f"Unknown compression: {compression}")
+    return open(path, 'wb')
+
+class ResultExporter:
+    """Base class of the streaming exporters.
+
+    ``target`` is a path ('-' for stdout) or an open stream. Subclasses turn
+    each result into text with ``_encode``; for paths, encoded records are
+    collected until ``buffer_size`` characters are pending and then written
+    in one call, which keeps compressor and system call overhead per batch,
+    not per record. Streams passed in (stdout included) get each record as
+    soon as it is written, flushed, so a pipe's reader sees results as they
+    are produced; pass ``buffer_size`` to batch those writes too.
+    """
+
+    def __init__(self, target, compression='none', buffer_size=None):
+        self.count = 0
+        self._pending = []
+        self._pending_size = 0
+        if target == '-':
+            target = sys.stdout
+        if isinstance(target, str):
+            self._stream = open_compressed(target, compression)
+            self._owns_stream = True
+        else:
+            if compression != 'none':
+                raise ValueError("Compression needs an output path, not a stream")
+            self._stream = target
+            self._owns_stream = False
+        if buffer_size is None:
+            buffer_size = FILE_BUFFER_SIZE if self._owns_stream else 0
+        self.buffer_size = buffer_size
+        self._binary = not isinstance(self._stream, io.TextIOBase)
+
+    def write(self, record_id, text, method, results):
+        """Add one analysis result"""
+        chunk = self._encode(record_id, text, method, results)
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        self.count += 1
+        if self._pending_size >= self.buffer_size:
+            self._drain()
+
+    def _encode(self, record_id, text, method, results):
+        raise NotImplementedError
+
+    def _drain(self):
+        if self._pending:
+            data = ''.join(self._pending)
+            self._stream.write(data.encode('utf-8') if self._binary else data)
+            self._pending = []
+            self._pending_size = 0
+            if not self._owns_stream:
+                self._stream.flush()
+
+    def flush(self):
+        self._drain()
+        self._stream.flush()
+
+    def close(self):
+        """Write anything pending and close the output (streams passed in are only flushed)"""
+        if self._stream is None:
+            return
+        self.flush()
+        if self._owns_stream:
+            self._stream.close()
+        self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class JSONLExporter(ResultExporter):
+    """One JSON object per line, as written by batch mode"""
+
+    def _encode(self, record_id, text, method, results):
+        return json.dumps({'id': record_id, 'text': text, 'method': method, 'results': results}) + '\n'
+
+class CSVExporter(ResultExporter):
+    """Flat CSV with the COLUMNS header"""
+
+    def __init__(self, target, compression='none', buffer_size=None):
+        super().__init__(target, compression, buffer_size)
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=COLUMNS, lineterminator='\n')
+        self._writer.writeheader()
+        self._pending.append(self._take())
+
+    def _take(self):
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value
+
+    def _encode(self, record_id, text, method, results):
+        self._writer.writerow(flatten_result(record_id, text, method, results))
+        return self._take()
+
+class ParquetExporter(ResultExporter):
+    """Parquet file written one row group at a time (requires pyarrow).
+
+    Rows are buffered column-wise up to ``row_group_size`` and then written
+    as a row group. gzip and zstd select Parquet's own column compression.
+    """
+
+    def __init__(self, target, compression='none', row_group_size=50000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Parquet output: pip install pyarrow") from e
+        if not isinstance(target, str) or target == '-':
+            raise ValueError("Parquet output needs a file path")
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self.count = 0
+        self._columns = {column: [] for column in COLUMNS}
+        self._schema = pa.schema(
+            [('id', pa.string()), ('text', pa.string()), ('method', pa.string())]
+            + [(column, pa.string() if key == 'sentiment' else
+                pa.int64() if section == 'statistics' and key != 'avg_word_length' else pa.float64())
+               for column, section, key in FLAT_COLUMNS]
+            + [('emotions', pa.string()), ('duplicate_of', pa.string()), ('duplicate_similarity', pa.float64())]
+            + [(column, pa.string()) for column in CASCADE_COLUMNS]
+        )
+        codec = {'none': 'none', 'gzip': 'gzip', 'zstd': 'zstd'}[compression]
+        self._writer = pq.ParquetWriter(target, self._schema, compression=codec)
+
+    def write(self, record_id, text, method, results):
+        row = flatten_result(str(record_id), text, method, results)
+        if row['duplicate_of'] is not None:
+            row['duplicate_of'] = str(row['duplicate_of'])
+        for column, values in self._columns.items():
+            values.append(row[column])
+        self.count += 1
+        if len(self._columns['id']) >= self.row_group_size:
+            self._drain()
+
+    def _drain(self):
+        if self._columns['id']:
+            table = self._pa.Table.from_pydict(self._columns, schema=self._schema)
+            self._writer.write_table(table)
+            self._columns = {column: [] for column in COLUMNS}
+
+    def flush(self):
+        self._drain()
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._drain()
+        self._writer.close()
+        self._writer = None
+
+# Exporter classes by format name; add an entry to support another format
+EXPORTERS = {
+    'jsonl': JSONLExporter,
+    'csv': CSVExporter,
+    'parquet': ParquetExporter
+}
+
+def open_exporter(target, export_format=None, compression=None):
+    """Open an exporter, taking the format and compression from the file name if not given"""
+    detected_format, detected_compression = detect_format(target if isinstance(target, str) else None)
+    export_format = export_format or detected_format
+    compression = compression or detected_compression
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    return EXPORTERS[export_format](target, compression)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Result Frames
+Collects analysis results from batch runs into typed columns (pandas
+DataFrame, optionally an Arrow table) instead of lists of nested dicts, with
+vectorized sentiment labels and group-by summaries.
+"""
+
+from array import array
+import numpy as np
+import pandas as pd
+from sentiment_engine import VADER_POSITIVE_THRESHOLD, VADER_NEGATIVE_THRESHOLD
+
+SENTIMENT_LABELS = ["Negative", "Neutral", "Positive"]
+
+# (column, results section, key) for the fixed float columns
+FLOAT_COLUMNS = [
+    ("vader_compound", "vader", "compound"),
+    ("vader_positive", "vader", "positive"),
+    ("vader_neutral", "vader", "neutral"),
+    ("vader_negative", "vader", "negative"),
+    ("textblob_polarity", "textblob", "polarity"),
+    ("textblob_subjectivity", "textblob", "subjectivity"),
+    ("avg_word_length", "statistics", "avg_word_length")
+]
+
+INT_COLUMNS = [
+    ("total_words", "statistics", "total_words"),
+    ("filtered_words", "statistics", "filtered_words"),
+    ("sentences", "statistics", "sentences")
+]
+
+class ResultFrameBuilder:
+    """Accumulates analyze_text results column by column.
+
+    Scores are appended to typed ``array`` buffers, so each document costs a
+    few machine words rather than a dozen dicts. Methods that were not run
+    are stored as NaN and statistics that were not computed as missing
+    (nullable Int64 columns); emotions get one integer column each (0 when
+    absent). Cascade results (see cascade_scoring) add the final label and
+    the number of tiers that ran.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self._floats = {column: array('d') for column, _, _ in FLOAT_COLUMNS}
+        self._ints = {column: array('q') for column, _, _ in INT_COLUMNS}
+        self._int_missing = {column: array('b') for column, _, _ in INT_COLUMNS}
+        # Label codes into SENTIMENT_LABELS (-1: not a cascade result) and tiers run (0: none)
+        self._cascade_labels = array('b')
+        self._cascade_tiers = array('q')
+        self._emotions = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, result, record_id=None):
+        """Add one analyze_text result"""
+        row = len(self.ids)
+        self.ids.append(row + 1 if record_id is None else record_id)
+
+        for column, section, key in FLOAT_COLUMNS:
+            value = result.get(section, {}).get(key)
+            self._floats[column].append(np.nan if value is None else float(value))
+        for column, section, key in INT_COLUMNS:
+            value = result.get(section, {}).get(key)
+            self._ints[column].append(0 if value is None else int(value))
+            self._int_missing[column].append(value is None)
+
+        cascade = result.get('cascade')
+        self._cascade_labels.append(SENTIMENT_LABELS.index(cascade['sentiment']) if cascade else -1)
+        self._cascade_tiers.append(len(cascade['tiers']) if cascade else 0)
+
+        emotions = result.get('emotions', {})
+        for emotion in emotions:
+            if emotion not in self._emotions:
+                # Backfill rows seen before this emotion first appeared
+                self._emotions[emotion] = array('q', bytes(8 * row))
+        for emotion, column in self._emotions.items():
+            column.append(emotions.get(emotion, 0))
+
+    def extend(self, results, ids=None):
+        """Add many results (optionally with matching record ids)"""
+        if ids is None:
+            for result in results:
+                self.append(result)
+        else:
+            for record_id, result in zip(ids, results):
+                self.append(result, record_id)
+        return self
+
+    def to_frame(self, labels=True):
+        """Build a DataFrame with fixed typed columns (and label columns if ``labels``)"""
+        data = {'id': self.ids}
+        # Copy out of the buffers so the builder can keep growing afterwards
+        for column, buffer in self._floats.items():
+            data[column] = np.frombuffer(buffer, dtype=np.float64).copy()
+        for column, buffer in self._ints.items():
+            data[column] = _nullable_ints(buffer, np.frombuffer(self._int_missing[column], dtype=np.int8))
+        tiers = np.frombuffer(self._cascade_tiers, dtype=np.int64)
+        data['cascade_sentiment'] = pd.Categorical.from_codes(
+            np.frombuffer(self._cascade_labels, dtype=np.int8).copy(), categories=SENTIMENT_LABELS)
+        data['cascade_tiers'] = _nullable_ints(self._cascade_tiers, tiers == 0)
+        for emotion, buffer in self._emotions.items():
+            data[f"emotion_{emotion}"] = np.frombuffer(buffer, dtype=np.int64).copy()
+
+        frame = pd.DataFrame(data)
+        if labels:
+            frame = label_sentiment(frame)
+        return frame
+
+def _nullable_ints(buffer, missing):
+    """Int64 column from an array('q') buffer and a missing-value mask"""
+    values = np.frombuffer(buffer, dtype=np.int64).copy()
+    return pd.arrays.IntegerArray(values, np.asarray(missing, dtype=bool).copy())
+
+def vader_labels(compound):
+    """Vectorized VADER labels for an array of compound scores (NaN stays missing)"""
+    compound = np.asarray(compound, dtype=np.float64)
+    codes = np.select(
+        [compound >= VADER_POSITIVE_THRESHOLD, compound <= VADER_NEGATIVE_THRESHOLD],
+        [2, 0],
+        default=1
+    )
+    codes[np.isnan(compound)] = -1
+    return pd.Categorical.from_codes(codes, categories=SENTIMENT_LABELS)
+
+def textblob_labels(polarity):
+    """Vectorized TextBlob labels for an array of polarities (NaN stays missing)"""
+    polarity = np.asarray(polarity, dtype=np.float64)
+    codes = (np.sign(np.nan_to_num(polarity)) + 1).astype(np.int8)
+    codes[np.isnan(polarity)] = -1
+    return pd.Categorical.from_codes(codes, categories=SENTIMENT_LABELS)
+
+def label_sentiment(frame):
+    """Add categorical vader_sentiment / textblob_sentiment columns"""
+    frame = frame.copy()
+    frame['vader_sentiment'] = vader_labels(frame['vader_compound'])
+    frame['textblob_sentiment'] = textblob_labels(frame['textblob_polarity'])
+    return frame
+
+def results_to_frame(results, ids=None):
+    """Collect an iterable of analyze_text results into a labelled DataFrame"""
+    return ResultFrameBuilder().extend(results, ids).to_frame()
+
+def summarize(frame, by='vader_sentiment'):
+    """Group-by summary: document count plus mean scores and emotion totals per group"""
+    if by not in frame.columns:
+        frame = label_sentiment(frame)
+    score_columns = [column for column, _, _ in FLOAT_COLUMNS if frame[column].notna().any()]
+    if 'cascade_tiers' in frame.columns and frame['cascade_tiers'].notna().any():
+        # Mean tiers run per label: how often each label needed escalating
+        score_columns.append('cascade_tiers')
+    emotion_columns = [column for column in frame.columns if column.startswith('emotion_')]
+
+    grouped = frame.groupby(by, observed=True)
+    summary = grouped[score_columns].mean()
+    summary.insert(0, 'documents', grouped.size())
+    if emotion_columns:
+        summary = summary.join(grouped[emotion_columns].sum())
+    return summary
+
+def to_arrow(frame):
+    """Convert a result frame to a pyarrow Table (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("pyarrow is required for Arrow output: pip install pyarrow") from e
+    return pa.Table.from_pandas(frame, preserve_index=False)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Result Records
+Compact, slotted representation of a single analysis result. A record holds
+the scores as flat attributes instead of the nested result dicts returned by
+analyze_text, and converts back to that exact dict/JSON shape on demand.
+"""
+
+import sys
+from sentiment_engine import vader_label, textblob_label
+
+_VADER_KEYS = ('sentiment', 'compound', 'positive', 'neutral', 'negative')
+_TEXTBLOB_KEYS = ('sentiment', 'polarity', 'subjectivity')
+_STATISTICS_KEYS = ('total_words', 'filtered_words', 'sentences', 'avg_word_length')
+
+class AnalysisRecord:
+    """One analysis result with flat, slotted fields.
+
+    Scores of a method that was not run are None. Emotions are a tuple of
+    (emotion, score) pairs with interned names, or None when they were not
+    computed (likewise the statistics). Sentiment labels are not
+    stored; they are derived from the scores with the analyzer's thresholds.
+    Anything beyond the standard fields (for example the per-sentence
+    breakdown of sentence-level scoring) is kept as-is in ``extra``.
+    """
+
+    __slots__ = (
+        'vader_compound', 'vader_positive', 'vader_neutral', 'vader_negative',
+        'textblob_polarity', 'textblob_subjectivity',
+        'emotions',
+        'total_words', 'filtered_words', 'sentences', 'avg_word_length',
+        'extra'
+    )
+
+    def __init__(self, vader=None, textblob=None, emotions=(), statistics=None, extra=None):
+        if vader is not None:
+            self.vader_compound, self.vader_positive, self.vader_neutral, self.vader_negative = vader
+        else:
+            self.vader_compound = self.vader_positive = self.vader_neutral = self.vader_negative = None
+        if textblob is not None:
+            self.textblob_polarity, self.textblob_subjectivity = textblob
+        else:
+            self.textblob_polarity = self.textblob_subjectivity = None
+        self.emotions = tuple(emotions) if emotions is not None else None
+        if statistics is not None:
+            self.total_words, self.filtered_words, self.sentences, self.avg_word_length = statistics
+        else:
+            self.total_words = self.filtered_words = self.sentences = self.avg_word_length = None
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, results):
+        """Build a record from an analyze_text result dict"""
+        vader = textblob = statistics = None
+        extra = {}
+
+        for section, value in results.items():
+            if section == 'vader':
+                vader = (value['compound'], value['positive'], value['neutral'], value['negative'])
+                rest = {k: v for k, v in value.items() if k not in _VADER_KEYS}
+            elif section == 'textblob':
+                textblob = (value['polarity'], value['subjectivity'])
+                rest = {k: v for k, v in value.items() if k not in _TEXTBLOB_KEYS}
+            elif section == 'statistics':
+                statistics = tuple(value[k] for k in _STATISTICS_KEYS)
+                rest = {k: v for k, v in value.items() if k not in _STATISTICS_KEYS}
+            elif section == 'emotions':
+                continue
+            else:
+                extra[section] = value
+                continue
+            if rest:
+                extra[f"{section}."] = rest
+
+        emotions = None
+        if 'emotions' in results:
+            emotions = tuple((sys.intern(name), score) for name, score in results['emotions'].items())
+        return cls(vader, textblob, emotions, statistics, extra or None)
+
+    def to_dict(self):
+        """Convert back to the analyze_text result dict (same keys and order)"""
+        extra = self.extra or {}
+        results = {}
+
+        if self.vader_compound is not None:
+            results['vader'] = {
+                'sentiment': vader_label(self.vader_compound),
+                'compound': self.vader_compound,
+                'positive': self.vader_positive,
+                'neutral': self.vader_neutral,
+                'negative': self.vader_negative
+            }
+            results['vader'].update(extra.get('vader.', {}))
+        if self.textblob_polarity is not None:
+            results['textblob'] = {
+                'sentiment': textblob_label(self.textblob_polarity),
+                'polarity': self.textblob_polarity,
+                'subjectivity': self.textblob_subjectivity
+            }
+            results['textblob'].update(extra.get('textblob.', {}))
+
+        for section, value in extra.items():
+            if not section.endswith('.'):
+                results[section] = value
+
+        if self.emotions is not None:
+            results['emotions'] = dict(self.emotions)
+        if self.total_words is not None:
+            results['statistics'] = dict(zip(_STATISTICS_KEYS, (
+                self.total_words, self.filtered_words, self.sentences, self.avg_word_length
+            )))
+            results['statistics'].update(extra.get('statistics.', {}))
+        return results
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"AnalysisRecord(compound={self.vader_compound}, polarity={self.textblob_polarity}, "
+                f"emotions={dict(self.emotions or ())}, words={self.total_words})")
@@ -1,42 +1,81 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-import pandas as pd
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
+from sentiment_charts import SentimentCharts
+from analysis_history import AnalysisHistory
+from result_exporters import open_exporter
+from file_analysis import (
+    list_folder, iter_folder_texts, iter_file_texts, input_format_for, count_records,
+    csv_columns, run_file_analysis
+)
+from sentiment_engine import SentimentEngine
+from text_preprocessing import missing_nltk_data, download_nltk_data
+import os
+import sqlite3
 import threading
 import time
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Live mode waits for this pause in typing before re-analyzing
+LIVE_DEBOUNCE_MS = 400
+
+# Every analysis is appended to this log; only the last HISTORY_SIZE stay in memory
+HISTORY_DB = os.path.join(os.path.expanduser("~"), ".sentiment_analysis_history.sqlite3")
+HISTORY_SIZE = 100
+
+# Result file types; the format and compression follow the extension
+EXPORT_FILETYPES = [
+    ("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("Parquet", "*.parquet"),
+    ("Compressed JSON Lines / CSV", "*.jsonl.gz *.csv.gz *.jsonl.zst *.csv.zst")
+]
 
 class SentimentAnalysisTool:
-    def __init__(self, root):
+    def __init__(self, root, history_size=HISTORY_SIZE, history_db=HISTORY_DB):
         self.root = root
         self.root.title("Sentiment Analysis Tool")
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f0f0')
         
-        # Initialize analyzers
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        # Shared analysis core; its backends load their models on first use
+        self.engine = SentimentEngine()
+        self._incremental_analyzer = None
         
-        # Create GUI components
-        self.create_widgets()
+        # Live analysis state (only touched from the Tk main thread)
+        self._live_after_id = None
+        self._live_busy = False
+        self._live_pending = False
+        
+        # Set to cancel the running file analysis
+        self._batch_cancel = None
         
         # Store analysis history
-        self.analysis_history = []
+        self.analysis_history = self._open_history(history_size, history_db)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Create GUI components
+        self.create_widgets()
+    
+    @staticmethod
+    def _open_history(history_size, history_db):
+        try:
+            return AnalysisHistory(max_entries=history_size, db_path=history_db)
+        except sqlite3.Error as e:
+            # Still usable, just without the on-disk log
+            print(f"Warning: history log {history_db} unavailable ({e}); keeping history in memory only")
+            return AnalysisHistory(max_entries=history_size)
+    
+    def on_close(self):
+        if self._batch_cancel is not None:
+            self._batch_cancel.set()
+        self.analysis_history.close()
+        self.root.destroy()
+        
+    @property
+    def incremental_analyzer(self):
+        """Paragraph-caching analyzer used by live mode, built on first use"""
+        if self._incremental_analyzer is None:
+            from cli_sentiment_analysis import CLISentimentAnalyzer
+            from incremental_analysis import IncrementalAnalyzer
+            self._incremental_analyzer = IncrementalAnalyzer(CLISentimentAnalyzer(engine=self.engine))
+        return self._incremental_analyzer
         
     def create_widgets(self):
         # Main title
@@ -70,6 +109,7 @@ class SentimentAnalysisTool:
             wrap=tk.WORD
         )
         self.text_input.pack(fill=tk.BOTH, expand=True)
+        self.text_input.bind('<<Modified>>', self._on_text_modified)
         
         # Sample text buttons
         sample_frame = ttk.Frame(input_frame)
@@ -107,23 +147,38 @@ class SentimentAnalysisTool:
             method_frame, 
             text="VADER", 
             variable=self.method_var, 
-            value="vader"
+            value="vader",
+            command=self._schedule_live_analysis
         ).pack(side=tk.LEFT, padx=(0, 10))
         
         ttk.Radiobutton(
             method_frame, 
             text="TextBlob", 
             variable=self.method_var, 
-            value="textblob"
+            value="textblob",
+            command=self._schedule_live_analysis
         ).pack(side=tk.LEFT, padx=(0, 10))
         
         ttk.Radiobutton(
             method_frame, 
             text="Both", 
             variable=self.method_var, 
-            value="both"
+            value="both",
+            command=self._schedule_live_analysis
         ).pack(side=tk.LEFT)
         
+        # Live mode: re-analyze as the user types, rescoring only edited paragraphs
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            options_frame,
+            text="Live analysis (as you type)",
+            variable=self.live_var,
+            command=self._schedule_live_analysis
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
+        self.live_status = ttk.Label(options_frame, text="")
+        self.live_status.pack(anchor=tk.W)
+        
         # Analyze button
         analyze_frame = ttk.Frame(left_panel)
         analyze_frame.pack(fill=tk.X, pady=(0, 10))
@@ -142,6 +197,41 @@ class SentimentAnalysisTool:
             mode='indeterminate'
         )
         
+        # File analysis: many documents on a process pool
+        files_frame = ttk.LabelFrame(left_panel, text="Analyze Files", padding=10)
+        files_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        files_buttons = ttk.Frame(files_frame)
+        files_buttons.pack(fill=tk.X)
+        
+        self.folder_button = ttk.Button(
+            files_buttons,
+            text="Folder...",
+            command=self.analyze_folder
+        )
+        self.folder_button.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.data_file_button = ttk.Button(
+            files_buttons,
+            text="CSV / JSONL File...",
+            command=self.analyze_data_file
+        )
+        self.data_file_button.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.cancel_button = ttk.Button(
+            files_buttons,
+            text="Cancel",
+            command=self.cancel_file_analysis,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.LEFT)
+        
+        self.batch_progress = ttk.Progressbar(files_frame, mode='determinate')
+        self.batch_progress.pack(fill=tk.X, pady=(10, 0))
+        
+        self.batch_status = ttk.Label(files_frame, text="")
+        self.batch_status.pack(anchor=tk.W)
+        
         # Right panel for results
         right_panel = ttk.Frame(main_frame)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
@@ -165,9 +255,9 @@ class SentimentAnalysisTool:
         viz_frame = ttk.LabelFrame(right_panel, text="Visualization", padding=10)
         viz_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Create matplotlib figure for charts
-        self.fig, self.ax = plt.subplots(figsize=(6, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, viz_frame)
+        # One figure for the whole session; each analysis updates it in place
+        self.charts = SentimentCharts.create(viz_frame)
+        self.canvas = self.charts.canvas
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Clear button
@@ -216,33 +306,7 @@ class SentimentAnalysisTool:
     def _perform_analysis(self, text):
         try:
             method = self.method_var.get()
-            results = {}
-            
-            if method in ["vader", "both"]:
-                vader_scores = self.vader_analyzer.polarity_scores(text)
-                results["VADER"] = {
-                    "sentiment": self._get_vader_sentiment(vader_scores),
-                    "scores": vader_scores,
-                    "compound": vader_scores['compound']
-                }
-                
-            if method in ["textblob", "both"]:
-                blob = TextBlob(text)
-                textblob_polarity = blob.sentiment.polarity
-                textblob_subjectivity = blob.sentiment.subjectivity
-                results["TextBlob"] = {
-                    "sentiment": self._get_textblob_sentiment(textblob_polarity),
-                    "polarity": textblob_polarity,
-                    "subjectivity": textblob_subjectivity
-                }
-            
-            # Get emotion analysis
-            emotions = self._analyze_emotions(text)
-            results["Emotions"] = emotions
-            
-            # Get text statistics
-            stats = self._get_text_statistics(text)
-            results["Statistics"] = stats
+            results = self._from_engine_results(self.engine.analyze(text, method))
             
             # Update GUI in main thread
             self.root.after(0, lambda: self._display_results(results, text))
@@ -252,58 +316,206 @@ class SentimentAnalysisTool:
         finally:
             self.root.after(0, self._stop_progress)
             
-    def _get_vader_sentiment(self, scores):
-        compound = scores['compound']
-        if compound >= 0.05:
-            return "Positive"
-        elif compound <= -0.05:
-            return "Negative"
-        else:
-            return "Neutral"
+    def _on_text_modified(self, event=None):
+        # Tk only sends <<Modified>> again once the flag has been reset
+        self.text_input.edit_modified(False)
+        self._schedule_live_analysis()
+        
+    def _schedule_live_analysis(self):
+        """Debounce: (re)start the timer for the next live analysis"""
+        if self._live_after_id is not None:
+            self.root.after_cancel(self._live_after_id)
+            self._live_after_id = None
+        if self.live_var.get():
+            self._live_after_id = self.root.after(LIVE_DEBOUNCE_MS, self._start_live_analysis)
             
-    def _get_textblob_sentiment(self, polarity):
-        if polarity > 0:
-            return "Positive"
-        elif polarity < 0:
-            return "Negative"
-        else:
-            return "Neutral"
+    def _start_live_analysis(self):
+        self._live_after_id = None
+        if self._live_busy:
+            # Run again with the latest text once the current pass is done
+            self._live_pending = True
+            return
+        
+        text = self.text_input.get(1.0, tk.END).strip()
+        if not text:
+            self.live_status.config(text="")
+            return
+        
+        self._live_busy = True
+        thread = threading.Thread(target=self._perform_live_analysis,
+                                  args=(text, self.method_var.get()))
+        thread.daemon = True
+        thread.start()
+        
+    def _perform_live_analysis(self, text, method):
+        try:
+            start = time.perf_counter()
+            analyzer = self.incremental_analyzer
+            results = self._from_engine_results(analyzer.update(text, method))
+            status = (f"Rescored {analyzer.rescored} of {analyzer.rescored + analyzer.reused} "
+                      f"paragraphs in {1000 * (time.perf_counter() - start):.0f} ms")
+            self.root.after(0, lambda: self._display_live_results(results, text, status))
+        except Exception as e:
+            message = f"Live analysis failed: {e}"
+            self.root.after(0, lambda: self.live_status.config(text=message))
+        finally:
+            self.root.after(0, self._finish_live_analysis)
             
-    def _analyze_emotions(self, text):
-        # Simple emotion analysis based on keyword matching
-        emotions = {
-            "joy": ["happy", "joy", "excited", "great", "wonderful", "amazing", "fantastic", "love", "like"],
-            "sadness": ["sad", "depressed", "unhappy", "terrible", "awful", "horrible", "disappointed", "hate"],
-            "anger": ["angry", "mad", "furious", "rage", "hate", "terrible", "awful", "horrible"],
-            "fear": ["afraid", "scared", "fear", "terrified", "worried", "anxious", "nervous"],
-            "surprise": ["surprised", "amazed", "shocked", "wow", "incredible", "unbelievable"]
-        }
+    def _finish_live_analysis(self):
+        self._live_busy = False
+        if self._live_pending:
+            self._live_pending = False
+            self._start_live_analysis()
+            
+    def _display_live_results(self, results, text, status):
+        # Results of a pass that was overtaken by further typing are still
+        # shown; the pending pass replaces them shortly
+        if not self.live_var.get():
+            return
+        self.live_status.config(text=status)
+        self._display_results(results, text, record=False)
+        
+    @staticmethod
+    def _from_engine_results(analysis):
+        """Convert engine (analyze_text) results to the GUI's result layout"""
+        results = {}
+        if 'vader' in analysis:
+            vader = analysis['vader']
+            results["VADER"] = {
+                "sentiment": vader['sentiment'],
+                "scores": {'neg': vader['negative'], 'neu': vader['neutral'],
+                           'pos': vader['positive'], 'compound': vader['compound']},
+                "compound": vader['compound']
+            }
+        if 'textblob' in analysis:
+            textblob = analysis['textblob']
+            results["TextBlob"] = {
+                "sentiment": textblob['sentiment'],
+                "polarity": textblob['polarity'],
+                "subjectivity": textblob['subjectivity']
+            }
+        results["Emotions"] = analysis['emotions']
+        results["Statistics"] = analysis['statistics']
+        return results
+            
+    def analyze_folder(self):
+        folder = filedialog.askdirectory(title="Folder of .txt documents")
+        if not folder:
+            return
+        paths = list_folder(folder)
+        if not paths:
+            messagebox.showinfo("Info", "No .txt files found in that folder.")
+            return
+        self._start_file_analysis(iter_folder_texts(folder, paths), len(paths),
+                                  os.path.basename(os.path.normpath(folder)))
+        
+    def analyze_data_file(self):
+        path = filedialog.askopenfilename(
+            title="Documents to analyze",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl *.ndjson"),
+                       ("Text, one document per line", "*.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
         
-        text_lower = text.lower()
-        emotion_scores = {}
+        input_format = input_format_for(path)
+        text_field = "text"
+        try:
+            if input_format == "csv":
+                columns = csv_columns(path)
+                if text_field not in columns:
+                    text_field = simpledialog.askstring(
+                        "Text Column",
+                        f"Column holding the text ({', '.join(columns)}):",
+                        parent=self.root
+                    )
+                    if not text_field:
+                        return
+                    if text_field not in columns:
+                        messagebox.showerror("Error", f"The CSV has no column named '{text_field}'.")
+                        return
+            total = count_records(path, input_format)
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Failed to read {path}: {str(e)}")
+            return
         
-        for emotion, keywords in emotions.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                emotion_scores[emotion] = score
-                
-        return emotion_scores
+        self._start_file_analysis(iter_file_texts(path, input_format, text_field), total,
+                                  os.path.basename(path))
         
-    def _get_text_statistics(self, text):
-        words = word_tokenize(text.lower())
-        stop_words = set(stopwords.words('english'))
+    def _start_file_analysis(self, records, total, source):
+        output = filedialog.asksaveasfilename(
+            title="Save per-document results (Cancel to skip)",
+            defaultextension=".jsonl",
+            filetypes=EXPORT_FILETYPES
+        )
         
-        # Filter out stop words and punctuation
-        filtered_words = [word for word in words if word.isalnum() and word not in stop_words]
+        self._batch_cancel = threading.Event()
+        for button in (self.folder_button, self.data_file_button, self.analyze_button):
+            button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.batch_progress.config(maximum=max(total, 1), value=0)
+        self.batch_status.config(text=f"Starting workers for {total} documents...")
         
-        return {
-            "total_words": len(words),
-            "filtered_words": len(filtered_words),
-            "sentences": len(text.split('.')),
-            "avg_word_length": np.mean([len(word) for word in filtered_words]) if filtered_words else 0
-        }
+        thread = threading.Thread(
+            target=self._perform_file_analysis,
+            args=(records, total, source, self.method_var.get(), output or None, self._batch_cancel)
+        )
+        thread.daemon = True
+        thread.start()
+        
+    def _perform_file_analysis(self, records, total, source, method, output, cancel):
+        def report(summary):
+            # Snapshot here; the summary keeps changing in this thread
+            snapshot = (summary.documents, dict(summary.labels), summary.to_gui_results())
+            self.root.after(0, lambda: self._show_file_progress(source, total, *snapshot))
         
-    def _display_results(self, results, text):
+        try:
+            start = time.perf_counter()
+            exporter = open_exporter(output) if output else None
+            try:
+                summary, cancelled = run_file_analysis(records, method, workers=os.cpu_count(),
+                                                       exporter=exporter, cancel=cancel, progress=report)
+            finally:
+                if exporter is not None:
+                    exporter.close()
+            elapsed = time.perf_counter() - start
+            self.root.after(0, lambda: self._finish_file_analysis(source, summary, cancelled,
+                                                                  elapsed, output))
+        except Exception as e:
+            message = str(e)
+            self.root.after(0, lambda: messagebox.showerror("Error", f"File analysis failed: {message}"))
+        finally:
+            self.root.after(0, self._reset_file_controls)
+            
+    def _show_file_progress(self, source, total, documents, labels, results):
+        self.batch_progress.config(value=documents)
+        self.batch_status.config(text=f"{documents} / {total} documents")
+        counts = ", ".join(f"{label} {count}" for label, count in sorted(labels.items()))
+        self._display_results(results, f"{source}: {documents} documents ({counts})", record=False)
+        
+    def _finish_file_analysis(self, source, summary, cancelled, elapsed, output):
+        status = f"{'Cancelled after' if cancelled else 'Done:'} {summary.documents} documents in {elapsed:.1f} s"
+        if output:
+            status += f", results in {os.path.basename(output)}"
+        self.batch_status.config(text=status)
+        if summary.documents and not cancelled:
+            # The aggregate goes into the history like a single analysis
+            self.analysis_history.add(f"[{summary.documents} documents] {source}",
+                                      summary.to_gui_results())
+            
+    def cancel_file_analysis(self):
+        if self._batch_cancel is not None:
+            self._batch_cancel.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.batch_status.config(text="Cancelling...")
+            
+    def _reset_file_controls(self):
+        self._batch_cancel = None
+        for button in (self.folder_button, self.data_file_button, self.analyze_button):
+            button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        
+    def _display_results(self, results, text, record=True):
         # Update results text
         self.results_text.config(state=tk.NORMAL)
         self.results_text.delete(1.0, tk.END)
@@ -346,69 +558,13 @@ class SentimentAnalysisTool:
         # Create visualization
         self._create_visualization(results)
         
-        # Store in history
-        self.analysis_history.append({
-            "text": text[:100] + "..." if len(text) > 100 else text,
-            "results": results,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        })
+        # Store in history (live updates are not recorded)
+        if not record:
+            return
+        self.analysis_history.add(text[:100] + "..." if len(text) > 100 else text, results)
         
     def _create_visualization(self, results):
-        self.ax.clear()
-        
-        # Create subplots for different visualizations
-        if "VADER" in results:
-            # VADER scores bar chart
-            vader_data = results["VADER"]["scores"]
-            categories = list(vader_data.keys())
-            values = list(vader_data.values())
-            
-            bars = self.ax.bar(categories, values, color=['green', 'gray', 'red'])
-            self.ax.set_title('VADER Sentiment Scores')
-            self.ax.set_ylabel('Score')
-            self.ax.set_ylim(0, 1)
-            
-            # Add value labels on bars
-            for bar, value in zip(bars, values):
-                self.ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.01,
-                           f'{value:.3f}', ha='center', va='bottom')
-        
-        elif "TextBlob" in results:
-            # TextBlob polarity and subjectivity
-            polarity = results["TextBlob"]["polarity"]
-            subjectivity = results["TextBlob"]["subjectivity"]
-            
-            self.ax.scatter([polarity], [subjectivity], s=200, c='blue', alpha=0.7)
-            self.ax.set_xlabel('Polarity (-1 to 1)')
-            self.ax.set_ylabel('Subjectivity (0 to 1)')
-            self.ax.set_title('TextBlob Analysis')
-            self.ax.grid(True, alpha=0.3)
-            self.ax.set_xlim(-1, 1)
-            self.ax.set_ylim(0, 1)
-            
-            # Add reference lines
-            self.ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.5)
-            self.ax.axvline(x=0, color='gray', linestyle='--', alpha=0.5)
-        
-        # Add emotion chart if available
-        if "Emotions" in results and results["Emotions"]:
-            # Create emotion chart in a separate figure
-            fig2, ax2 = plt.subplots(figsize=(4, 3))
-            emotion_names = list(results["Emotions"].keys())
-            emotion_scores = list(results["Emotions"].values())
-            
-            bars = ax2.bar(emotion_names, emotion_scores, color='orange')
-            ax2.set_title('Emotion Analysis')
-            ax2.set_ylabel('Score')
-            
-            # Rotate x-axis labels for better readability
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
-            
-            # Add the emotion chart to the main window
-            canvas2 = FigureCanvasTkAgg(fig2, self.root)
-            canvas2.get_tk_widget().pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=5)
-        
-        self.canvas.draw()
+        self.charts.update(results)
         
     def _stop_progress(self):
         self.progress.stop()
@@ -420,43 +576,43 @@ class SentimentAnalysisTool:
         self.results_text.config(state=tk.NORMAL)
         self.results_text.delete(1.0, tk.END)
         self.results_text.config(state=tk.DISABLED)
-        self.ax.clear()
-        self.canvas.draw()
+        self.live_status.config(text="")
+        if self._incremental_analyzer is not None:
+            self._incremental_analyzer.reset()
+        self.charts.clear()
         
     def export_results(self):
         if not self.analysis_history:
             messagebox.showinfo("Info", "No analysis results to export.")
             return
             
+        filename = filedialog.asksaveasfilename(
+            title="Export analysis history",
+            initialfile=f"sentiment_analysis_{time.strftime('%Y%m%d_%H%M%S')}.txt",
+            defaultextension=".txt",
+            filetypes=[("Text report", "*.txt")] + EXPORT_FILETYPES
+        )
+        if not filename:
+            return
+            
         try:
-            # Create a simple export of the last analysis
-            filename = f"sentiment_analysis_{time.strftime('%Y%m%d_%H%M%S')}.txt"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("SENTIMENT ANALYSIS RESULTS\n")
-                f.write("=" * 50 + "\n\n")
-                
-                for entry in self.analysis_history[-3:]:  # Export last 3 analyses
-                    f.write(f"Timestamp: {entry['timestamp']}\n")
-                    f.write(f"Text: {entry['text']}\n")
-                    f.write("-" * 30 + "\n")
-                    
-                    results = entry['results']
-                    for method, data in results.items():
-                        f.write(f"{method}:\n")
-                        if isinstance(data, dict):
-                            for key, value in data.items():
-                                if isinstance(value, float):
-                                    f.write(f"  {key}: {value:.3f}\n")
-                                else:
-                                    f.write(f"  {key}: {value}\n")
-                        f.write("\n")
-                    
-            messagebox.showinfo("Success", f"Results exported to {filename}")
+            # Stream every logged analysis, oldest first
+            if filename.lower().endswith(".txt"):
+                count = self.analysis_history.export(filename)
+            else:
+                with open_exporter(filename) as exporter:
+                    count = self.analysis_history.export_to(exporter)
+            messagebox.showinfo("Success", f"{count} analyses exported to {filename}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export results: {str(e)}")
 
 def main():
+    # The GUI is interactive, so fetch missing NLTK data here rather than at import
+    missing = missing_nltk_data()
+    if missing:
+        download_nltk_data(missing)
+    
     root = tk.Tk()
     app = SentimentAnalysisTool(root)
     root.mainloop()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Sentiment Charts
+The GUI's visualization panel: one figure with fixed axes for the VADER
+scores, the TextBlob polarity/subjectivity point and the emotion counts.
+The artists are created once and updated in place, and a new result only
+redraws the changed artists over a cached background (blitting), so repeated
+analyses neither allocate figures nor grow the window.
+"""
+
+import math
+from matplotlib.figure import Figure
+from emotion_lexicon import DEFAULT_LEXICON
+
+VADER_CATEGORIES = ('neg', 'neu', 'pos', 'compound')
+VADER_COLORS = ('red', 'gray', 'green', 'steelblue')
+
+def _nice_limit(value):
+    """Smallest of 1, 2, 5, 10, 20, 50, ... that is >= value"""
+    if value <= 1:
+        return 1
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+
+class SentimentCharts:
+    """Fixed set of charts updated in place.
+
+    Create with the Figure and its canvas (any matplotlib canvas; blitting
+    needs an interactive one such as FigureCanvasTkAgg) and call
+    ``update(results)`` with the GUI's result dict. Bars, labels and the
+    TextBlob marker are ``animated`` artists: the static parts are drawn once
+    into a background that is only re-captured when the layout changes
+    (method switch, new emotion, new emotion scale) or the canvas resizes.
+    """
+
+    def __init__(self, figure, canvas, emotions=None):
+        self.figure = figure
+        self.canvas = canvas
+        self._background = None
+        self._layout = None
+        self._animated = []
+
+        grid = figure.add_gridspec(2, 2, height_ratios=[3, 2])
+        self.vader_ax = figure.add_subplot(grid[0, 0])
+        self.textblob_ax = figure.add_subplot(grid[0, 1])
+        self.emotion_ax = figure.add_subplot(grid[1, :])
+
+        self._setup_vader()
+        self._setup_textblob()
+        self._setup_emotions(list(emotions if emotions is not None else DEFAULT_LEXICON.emotions))
+        figure.tight_layout()
+
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    @classmethod
+    def create(cls, master, figsize=(6, 4)):
+        """Build the figure and a Tk canvas inside ``master``"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        figure = Figure(figsize=figsize)
+        canvas = FigureCanvasTkAgg(figure, master)
+        return cls(figure, canvas)
+
+    def _setup_vader(self):
+        ax = self.vader_ax
+        ax.set_title('VADER Sentiment Scores', fontsize=9)
+        ax.set_ylim(-1, 1)
+        ax.axhline(0, color='black', linewidth=0.8)
+        ax.tick_params(labelsize=8)
+        self.vader_bars = ax.bar(VADER_CATEGORIES, [0] * len(VADER_CATEGORIES),
+                                 color=VADER_COLORS, animated=True)
+        self.vader_labels = [
+            ax.text(bar.get_x() + bar.get_width() / 2, 0, '', ha='center', va='bottom',
+                    fontsize=7, animated=True)
+            for bar in self.vader_bars
+        ]
+        self._vader_placeholder = ax.text(0.5, 0.5, 'not run', transform=ax.transAxes,
+                                          ha='center', va='center', color='gray')
+        self._animated_group('vader', list(self.vader_bars) + self.vader_labels)
+
+    def _setup_textblob(self):
+        ax = self.textblob_ax
+        ax.set_title('TextBlob Analysis', fontsize=9)
+        ax.set_xlim(-1, 1)
+        ax.set_ylim(0, 1)
+        ax.set_xlabel('Polarity', fontsize=8)
+        ax.set_ylabel('Subjectivity', fontsize=8)
+        ax.tick_params(labelsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.axhline(y=0.5, color='gray', linestyle='--', alpha=0.5)
+        ax.axvline(x=0, color='gray', linestyle='--', alpha=0.5)
+        self.textblob_point, = ax.plot([0], [0.5], 'o', markersize=12, color='blue',
+                                       alpha=0.7, animated=True)
+        self._textblob_placeholder = ax.text(0.5, 0.5, 'not run', transform=ax.transAxes,
+                                             ha='center', va='center', color='gray')
+        self._animated_group('textblob', [self.textblob_point])
+
+    def _setup_emotions(self, emotions):
+        ax = self.emotion_ax
+        ax.clear()
+        ax.set_title('Emotion Analysis', fontsize=9)
+        ax.tick_params(labelsize=8)
+        self.emotion_names = emotions
+        self.emotion_bars = ax.bar(emotions, [0] * len(emotions), color='orange', animated=True)
+        self._emotion_limit = 1
+        ax.set_ylim(0, self._emotion_limit)
+        self._animated_group('emotions', list(self.emotion_bars))
+
+    def _animated_group(self, name, artists):
+        self._animated = [(group, a) for group, a in self._animated if group != name]
+        self._animated.extend((name, artist) for artist in artists)
+
+    def update(self, results):
+        """Show a new result: {'VADER': ..., 'TextBlob': ..., 'Emotions': ...}"""
+        vader = results.get("VADER")
+        textblob = results.get("TextBlob")
+        emotions = results.get("Emotions") or {}
+
+        if any(name not in self.emotion_names for name in emotions):
+            self._setup_emotions(self.emotion_names + [name for name in emotions
+                                                       if name not in self.emotion_names])
+        # The scale follows the current result, shrinking as well as growing
+        self._set_emotion_limit(_nice_limit(max(emotions.values(), default=0)))
+
+        if vader is not None:
+            scores = vader["scores"]
+            for bar, label, category in zip(self.vader_bars, self.vader_labels, VADER_CATEGORIES):
+                value = scores[category]
+                bar.set_height(value)
+                label.set_position((label.get_position()[0], max(value, 0) + 0.02))
+                label.set_text(f'{value:.3f}')
+        if textblob is not None:
+            self.textblob_point.set_data([textblob["polarity"]], [textblob["subjectivity"]])
+        for bar, name in zip(self.emotion_bars, self.emotion_names):
+            bar.set_height(emotions.get(name, 0))
+
+        self._show(vader is not None, textblob is not None, bool(emotions))
+
+    def clear(self):
+        """Reset all charts to their empty state"""
+        for bar in list(self.vader_bars) + list(self.emotion_bars):
+            bar.set_height(0)
+        self._set_emotion_limit(1)
+        self._show(False, False, False)
+
+    def _set_emotion_limit(self, limit):
+        if limit != self._emotion_limit:
+            self._emotion_limit = limit
+            self.emotion_ax.set_ylim(0, limit)
+
+    def _show(self, vader, textblob, emotions):
+        visible = {'vader': vader, 'textblob': textblob, 'emotions': emotions}
+        for group, artist in self._animated:
+            artist.set_visible(visible[group])
+
+        layout = (vader, textblob, tuple(self.emotion_names), self._emotion_limit)
+        if layout != self._layout or self._background is None:
+            # Static parts changed: full redraw, which re-captures the background
+            self._layout = layout
+            self._vader_placeholder.set_visible(not vader)
+            self._textblob_placeholder.set_visible(not textblob)
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, event):
+        """After every full draw (including resizes) cache the static background"""
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for _, artist in self._animated:
+            if artist.get_visible():
+                artist.axes.draw_artist(artist)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Sentiment Engine
+The analysis core shared by the GUI, the CLI and the demo. Each analysis
+(VADER, TextBlob, emotions, statistics) is a backend in the BACKENDS
+registry, and SentimentEngine runs them over a text and returns the
+analyze_text result layout. Importing this module never loads tkinter or
+matplotlib, and the scoring libraries are only imported when a backend is
+first used, so it is cheap to import in workers and servers.
+"""
+
+from compiled_lexicon import open_lexicon_file
+from emotion_lexicon import DEFAULT_LEXICON, analyze_emotions
+from text_preprocessing import prepare_text, text_statistics
+
+# Label thresholds (VADER compound; TextBlob labels by the sign of polarity)
+VADER_POSITIVE_THRESHOLD = 0.05
+VADER_NEGATIVE_THRESHOLD = -0.05
+
+# 'reference' is vaderSentiment itself; 'fast' is fast_vader.FastVader, which
+# gives identical scores with precompiled tables
+VADER_BACKENDS = ('reference', 'fast')
+
+# 'reference' is TextBlob itself; 'fast' is fast_textblob.FastTextBlob, which
+# gives identical scores from a precompiled lexicon table
+TEXTBLOB_BACKENDS = ('reference', 'fast')
+
+# Sentiment backends run for each --method choice
+METHOD_BACKENDS = {
+    'vader': ('vader',),
+    'textblob': ('textblob',),
+    'both': ('vader', 'textblob')
+}
+
+# Sections added to the sentiment scores on request, in output order; both
+# need the text tokenized
+EXTRAS = ('emotions', 'statistics')
+
+def vader_label(compound):
+    """Label a VADER compound score"""
+    if compound >= VADER_POSITIVE_THRESHOLD:
+        return "Positive"
+    elif compound <= VADER_NEGATIVE_THRESHOLD:
+        return "Negative"
+    else:
+        return "Neutral"
+
+def textblob_label(polarity):
+    """Label a TextBlob polarity"""
+    if polarity > 0:
+        return "Positive"
+    elif polarity < 0:
+        return "Negative"
+    else:
+        return "Neutral"
+
+def _call(stage, func, *args):
+    return func(*args)
+
+class Backend:
+    """Base class of the analysis backends.
+
+    ``analyze(text, prepared)`` returns one section of the results;
+    ``prepared`` is the text_preprocessing.PreparedText of the text, which
+    backends that work on tokens need and the others ignore.
+    """
+
+    # Whether analyze needs the PreparedText
+    needs_tokens = False
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def analyze(self, text, prepared=None):
+        raise NotImplementedError
+
+    def analyze_many(self, texts):
+        """Analyze several texts (backends with a faster batch path override this)"""
+        if self.needs_tokens:
+            return [self.analyze(text, prepare_text(text)) for text in texts]
+        return [self.analyze(text) for text in texts]
+
+    def get_state(self):
+        """Loaded models to keep in a warm-start snapshot (see analyzer_snapshot), or None"""
+        return None
+
+    def set_state(self, state):
+        """Restore what get_state returned"""
+
+class VaderBackend(Backend):
+    """VADER scores, using the engine's ``vader_backend`` implementation"""
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self._analyzer = None
+
+    @property
+    def analyzer(self):
+        """VADER analyzer, built on first use"""
+        if self._analyzer is None:
+            if self.engine.vader_backend == 'fast':
+                from fast_vader import FastVader
+                lexicon_file = self.engine.lexicon_file
+                if lexicon_file is not None:
+                    self._analyzer = FastVader(lexicon=lexicon_file['vader'], emojis=lexicon_file['vader_emojis'])
+                else:
+                    self._analyzer = FastVader()
+            else:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    def get_state(self):
+        return self.analyzer
+
+    def set_state(self, state):
+        self._analyzer = state
+
+    def analyze(self, text, prepared=None):
+        scores = self.analyzer.polarity_scores(text)
+        compound = scores['compound']
+        return {
+            'sentiment': vader_label(compound),
+            'compound': compound,
+            'positive': scores['pos'],
+            'neutral': scores['neu'],
+            'negative': scores['neg']
+        }
+
+class TextBlobBackend(Backend):
+    """TextBlob polarity and subjectivity, using the engine's ``textblob_backend`` implementation"""
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self._scorer = None
+
+    @property
+    def scorer(self):
+        """FastTextBlob scorer, built on first use (fast implementation only)"""
+        if self._scorer is None:
+            from fast_textblob import FastTextBlob
+            lexicon_file = self.engine.lexicon_file
+            if lexicon_file is not None:
+                self._scorer = FastTextBlob(lexicon=lexicon_file['textblob'])
+            else:
+                self._scorer = FastTextBlob()
+        return self._scorer
+
+    def get_state(self):
+        if self.engine.textblob_backend == 'fast':
+            return self.scorer
+        # TextBlob parses its sentiment lexicon into a module-level dict on first use
+        from textblob.en import sentiment
+        len(sentiment)
+        return dict(sentiment), sentiment._synsets, sentiment.labeler, sentiment._language
+
+    def set_state(self, state):
+        if self.engine.textblob_backend == 'fast':
+            self._scorer = state
+            return
+        from textblob.en import sentiment
+        words, sentiment._synsets, sentiment.labeler, sentiment._language = state
+        # A non-empty lazydict is never loaded again
+        dict.update(sentiment, words)
+
+    def analyze(self, text, prepared=None):
+        if self.engine.textblob_backend == 'fast':
+            polarity, subjectivity = self.scorer.sentiment(text)
+        else:
+            from textblob import TextBlob
+            sentiment = TextBlob(text).sentiment
+            polarity, subjectivity = sentiment.polarity, sentiment.subjectivity
+        return self._result(polarity, subjectivity)
+
+    def analyze_many(self, texts):
+        if self.engine.textblob_backend != 'fast':
+            return super().analyze_many(texts)
+        return [self._result(polarity, subjectivity)
+                for polarity, subjectivity in self.scorer.sentiment_many(texts)]
+
+    @staticmethod
+    def _result(polarity, subjectivity):
+        return {
+            'sentiment': textblob_label(polarity),
+            'polarity': polarity,
+            'subjectivity': subjectivity
+        }
+
+class EmotionsBackend(Backend):
+    """Keyword emotion counts from the engine's emotion lexicon"""
+
+    def analyze(self, text, prepared=None):
+        # The lexicon's own word tokens, not the shared NLTK ones: its terms are
+        # split the same way, so "super-happy", "sad/angry" and "can't wait" match
+        return analyze_emotions(text, self.engine.emotion_lexicon)
+
+class StatisticsBackend(Backend):
+    """Word, sentence and word-length statistics"""
+
+    needs_tokens = True
+
+    def analyze(self, text, prepared=None):
+        if prepared is None:
+            prepared = prepare_text(text)
+        return text_statistics(text, prepared.tokens, sentences=prepared.sentences)
+
+# Backend classes by name; add an entry to support another analysis
+BACKENDS = {
+    'vader': VaderBackend,
+    'textblob': TextBlobBackend,
+    'emotions': EmotionsBackend,
+    'statistics': StatisticsBackend
+}
+
+class SentimentEngine:
+    """Runs the registered backends over texts.
+
+    Backends are built once per engine and keep their loaded models, so an
+    engine should be reused. ``emotion_lexicon`` of None means the built-in
+    keyword lexicon.
+
+    ``lexicon_file`` is the path of a compiled lexicon (see compiled_lexicon).
+    The fast VADER and TextBlob backends then read their lexicons from the
+    memory-mapped file instead of parsing their own copy, and the emotion
+    lexicon comes from the file unless ``emotion_lexicon`` is given. The
+    reference backends always use their libraries' own data.
+    """
+
+    def __init__(self, emotion_lexicon=None, vader_backend='reference', textblob_backend='reference',
+                 lexicon_file=None):
+        if vader_backend not in VADER_BACKENDS:
+            raise ValueError(f"Unknown VADER backend: {vader_backend}")
+        if textblob_backend not in TEXTBLOB_BACKENDS:
+            raise ValueError(f"Unknown TextBlob backend: {textblob_backend}")
+        self.lexicon_file = open_lexicon_file(lexicon_file) if lexicon_file is not None else None
+        if emotion_lexicon is None and self.lexicon_file is not None:
+            emotion_lexicon = self.lexicon_file.emotion_lexicon()
+        self.emotion_lexicon = emotion_lexicon
+        self.vader_backend = vader_backend
+        self.textblob_backend = textblob_backend
+        self.backends = {name: backend(self) for name, backend in BACKENDS.items()}
+
+    @property
+    def lexicon(self):
+        """The emotion lexicon in use"""
+        return self.emotion_lexicon if self.emotion_lexicon is not None else DEFAULT_LEXICON
+
+    def get_state(self):
+        """{backend name: loaded state} of the backends that have any"""
+        states = {name: backend.get_state() for name, backend in self.backends.items()}
+        return {name: state for name, state in states.items() if state is not None}
+
+    def set_state(self, states):
+        """Restore backend state from get_state, skipping the loading it did"""
+        for name, state in states.items():
+            self.backends[name].set_state(state)
+
+    def score(self, name, text, prepared=None):
+        """Run one backend on a text"""
+        return self.backends[name].analyze(text, prepared)
+
+    def analyze(self, text, method='both', run=_call, extras=EXTRAS):
+        """Analyze a text with the sentiment backends of ``method`` plus the ``extras`` sections.
+
+        ``run(stage, func, *args)`` calls each stage; pass one to time or
+        otherwise wrap them (see instrumentation).
+        """
+        results = {}
+        for name in METHOD_BACKENDS.get(method, ()):
+            results[name] = run(name, self.backends[name].analyze, text)
+        return self.add_extras(text, results, extras, run)
+
+    def add_extras(self, text, results, extras=EXTRAS, run=_call):
+        """Add the requested EXTRAS sections (emotions, statistics) to ``results``"""
+        names = [name for name in EXTRAS if name in extras]
+        prepared = None
+        if any(self.backends[name].needs_tokens for name in names):
+            # Tokenize once for every section that works on the shared tokens
+            prepared = run('preprocess', prepare_text, text)
+        for name in names:
+            results[name] = run(name, self.backends[name].analyze, text, prepared)
+        return results
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Sentiment Scoring Server
+Keeps warm analyzers in a worker pool and serves them over local HTTP and/or
+a Unix socket, so clients avoid paying interpreter and lexicon startup per
+request.
+
+Endpoints (JSON in, JSON out):
+  GET  /health          -> {"status": "ok"}
+  POST /analyze         {"text": "...", "method": "both"} -> {"results": {...}}
+  POST /analyze_batch   {"texts": ["...", ...], "method": "both"} -> {"results": [{...}, ...]}
+
+Both POST endpoints accept "by_sentence": true for sentence-level scoring.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import stat
+import sys
+
+import cli_sentiment_analysis as cli
+from async_analyzer import AsyncSentimentAnalyzer
+
+METHODS = ('vader', 'textblob', 'both', 'cascade')
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+def _is_socket(path):
+    """Whether ``path`` is a Unix socket (without following symlinks)"""
+    try:
+        return stat.S_ISSOCK(os.lstat(path).st_mode)
+    except OSError:
+        return False
+
+class HTTPError(Exception):
+    """Error returned to the client with an HTTP status code"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class SentimentServer:
+    """asyncio front-end over a process pool of warm CLISentimentAnalyzer workers.
+
+    Single-text requests go through an AsyncSentimentAnalyzer, so concurrent
+    /analyze calls share executor round trips; batch requests are sent to
+    the same pool in chunks.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, unix_socket=None, workers=None,
+                 method='both', chunksize=32, emotion_lexicon=None,
+                 vader_backend='reference', textblob_backend='reference', lexicon_file=None):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.workers = workers or os.cpu_count() or 1
+        self.method = method
+        self.chunksize = chunksize
+        self.emotion_lexicon = emotion_lexicon
+        self.vader_backend = vader_backend
+        self.textblob_backend = textblob_backend
+        self.lexicon_file = lexicon_file
+        self.analyzer = None
+        self.executor = None
+        self._servers = []
+
+    async def start(self):
+        """Start the worker pool and listeners, returning the bound addresses"""
+        if self.unix_socket and os.path.lexists(self.unix_socket) and not _is_socket(self.unix_socket):
+            raise OSError(f"{self.unix_socket} exists and is not a socket")
+        # Starting the analyzer warms every worker, so the first requests don't pay for it
+        self.analyzer = AsyncSentimentAnalyzer(
+            method=self.method,
+            workers=self.workers,
+            emotion_lexicon=self.emotion_lexicon,
+            vader_backend=self.vader_backend,
+            textblob_backend=self.textblob_backend,
+            lexicon_file=self.lexicon_file
+        )
+        await self.analyzer.start()
+        self.executor = self.analyzer.executor
+
+        addresses = []
+        if self.port is not None:
+            server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+            self._servers.append(server)
+            host, port = server.sockets[0].getsockname()[:2]
+            addresses.append(f"http://{host}:{port}")
+        if self.unix_socket:
+            # A socket left behind by an earlier run is replaced
+            if _is_socket(self.unix_socket):
+                os.unlink(self.unix_socket)
+            server = await asyncio.start_unix_server(self._handle_connection, self.unix_socket)
+            self._servers.append(server)
+            addresses.append(f"unix:{self.unix_socket}")
+        return addresses
+
+    async def close(self):
+        """Stop listening and shut the worker pool down"""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self.unix_socket and _is_socket(self.unix_socket):
+            os.unlink(self.unix_socket)
+        if self.analyzer is not None:
+            await self.analyzer.close()
+            self.analyzer = None
+            self.executor = None
+
+    async def analyze(self, text, method=None, by_sentence=False):
+        """Analyze one text on the worker pool, batched with concurrent requests"""
+        return await self.analyzer.analyze(text, method or self.method, by_sentence)
+
+    async def analyze_batch(self, texts, method=None, by_sentence=False):
+        """Analyze many texts, spread over the pool in chunks, preserving order"""
+        loop = asyncio.get_running_loop()
+        chunks = [texts[i:i + self.chunksize] for i in range(0, len(texts), self.chunksize)]
+        chunk_results = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, cli._analyze_chunk, chunk,
+                                 method or self.method, by_sentence)
+            for chunk in chunks
+        ])
+        return [result for chunk in chunk_results for result in chunk]
+
+    async def _handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on a connection until the client closes it"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                verb, path, headers, body = request
+                try:
+                    status, payload = 200, await self._dispatch(verb, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception as e:
+                    status, payload = 500, {'error': f"Analysis failed: {e}"}
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            self._write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Read one request, returning (verb, path, headers, body) or None at EOF"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            verb, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HTTPError(400, 'Malformed request line')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length < 0:
+            raise HTTPError(400, 'Invalid Content-Length')
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return verb.upper(), path.split('?', 1)[0], headers, body
+
+    async def _dispatch(self, verb, path, body):
+        """Route a request to its endpoint"""
+        if path == '/health':
+            return {'status': 'ok', 'workers': self.workers}
+        if path not in ('/analyze', '/analyze_batch'):
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        if verb != 'POST':
+            raise HTTPError(405, f"{path} only accepts POST")
+
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(400, 'Request body is not valid JSON')
+        if not isinstance(request, dict):
+            raise HTTPError(400, 'Request body must be a JSON object')
+        method = request.get('method', self.method)
+        if method not in METHODS:
+            raise HTTPError(400, f"method must be one of {', '.join(METHODS)}")
+        by_sentence = request.get('by_sentence', False)
+        if not isinstance(by_sentence, bool):
+            raise HTTPError(400, "'by_sentence' must be true or false")
+        if by_sentence and method == 'cascade':
+            raise HTTPError(400, "'by_sentence' does not apply to the cascade method")
+
+        if path == '/analyze':
+            text = request.get('text')
+            if not isinstance(text, str) or not text.strip():
+                raise HTTPError(400, "'text' must be a non-empty string")
+            return {'method': method, 'results': await self.analyze(text, method, by_sentence)}
+
+        texts = request.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            raise HTTPError(400, "'texts' must be a list of strings")
+        return {'method': method, 'results': await self.analyze_batch(texts, method, by_sentence)}
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+async def _serve(server):
+    """Run until interrupted"""
+    addresses = await server.start()
+    for address in addresses:
+        print(f"Serving sentiment analysis on {address}")
+    print(f"Workers: {server.workers} (Ctrl+C to stop)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: fall back to KeyboardInterrupt
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+
+def serve_main(argv):
+    """Entry point for 'cli_sentiment_analysis.py serve'"""
+    parser = argparse.ArgumentParser(
+        prog='cli_sentiment_analysis.py serve',
+        description='Serve sentiment analysis over local HTTP and/or a Unix socket'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='HTTP bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='HTTP port (default: 8765)')
+    parser.add_argument('--no-http', action='store_true', help='Only listen on the Unix socket')
+    parser.add_argument('--unix-socket', metavar='PATH', help='Also listen on this Unix socket')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                        help='Worker processes (default: one per CPU)')
+    parser.add_argument('--method', choices=METHODS, default='both',
+                        help='Default analysis method (default: both)')
+    parser.add_argument('--emotion-lexicon', metavar='FILE',
+                        help='Emotion lexicon to use instead of the built-in keywords')
+    parser.add_argument('--vader-backend', choices=cli.VADER_BACKENDS, default='reference',
+                        help="VADER implementation (default: reference; 'fast' gives identical scores)")
+    parser.add_argument('--textblob-backend', choices=cli.TEXTBLOB_BACKENDS, default='reference',
+                        help="TextBlob implementation (default: reference; 'fast' gives identical scores)")
+    parser.add_argument('--lexicon-file', metavar='FILE',
+                        help='Compiled lexicon file the workers memory-map (see compile-lexicon)')
+    args = parser.parse_args(argv)
+
+    if args.no_http and not args.unix_socket:
+        parser.error('--no-http requires --unix-socket')
+
+    emotion_lexicon = None
+    if args.emotion_lexicon:
+        emotion_lexicon = cli.EmotionLexicon.from_file(args.emotion_lexicon)
+
+    server = SentimentServer(
+        host=args.host,
+        port=None if args.no_http else args.port,
+        unix_socket=args.unix_socket,
+        workers=args.workers or None,
+        method=args.method,
+        emotion_lexicon=emotion_lexicon,
+        vader_backend=args.vader_backend,
+        textblob_backend=args.textblob_backend,
+        lexicon_file=args.lexicon_file
+    )
+    try:
+        asyncio.run(_serve(server))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print("Server stopped.")
+
+if __name__ == '__main__':
+    serve_main(sys.argv[1:])
@@ -0,0 +1,16 @@
+import pytest
+
+from cli_sentiment_analysis import analyze_many, main
+
+@pytest.mark.parametrize('chunksize', [0, -1])
+def test_analyze_many_rejects_chunksize_below_one(chunksize):
+    with pytest.raises(ValueError):
+        list(analyze_many(["Great!"], method='vader', workers=2, chunksize=chunksize))
+
+@pytest.mark.parametrize('chunksize', ['0', '-3', 'x'])
+def test_cli_rejects_chunksize_below_one(tmp_path, chunksize):
+    source = tmp_path / 'in.txt'
+    source.write_text("Great!\n")
+    with pytest.raises(SystemExit) as exit_info:
+        main(['--batch', str(source), '--workers', '2', '--chunksize', chunksize])
+    assert exit_info.value.code == 2
@@ -0,0 +1,27 @@
+from emotion_lexicon import EmotionLexicon, analyze_emotions
+from sentiment_engine import SentimentEngine
+
+TEXTS = [
+    "I'm super-happy, it was a love-hate thing and I'm not sad/angry",
+    "Can't wait for the well-being retreat!",
+    "The product arrived. It works."
+]
+
+def test_pipeline_matches_analyze_emotions():
+    engine = SentimentEngine()
+    for text in TEXTS:
+        assert engine.analyze(text, 'vader')['emotions'] == analyze_emotions(text)
+    assert analyze_emotions(TEXTS[0]) == {'joy': 2, 'sadness': 2, 'anger': 2}
+
+def test_pipeline_matches_custom_lexicon_phrases():
+    lexicon = EmotionLexicon({'joy': ["can't wait", 'well-being', 'happy']})
+    engine = SentimentEngine(emotion_lexicon=lexicon)
+    text = "Can't wait for the well-being retreat, so happy!"
+    assert analyze_emotions(text, lexicon) == {'joy': 3}
+    assert engine.analyze(text, 'vader')['emotions'] == {'joy': 3}
+
+def test_sentence_mode_matches_analyze_emotions():
+    from cli_sentiment_analysis import CLISentimentAnalyzer
+    analyzer = CLISentimentAnalyzer()
+    results = analyzer.analyze_text(TEXTS[0], 'vader', by_sentence=True)
+    assert results['emotions'] == analyze_emotions(TEXTS[0])
@@ -0,0 +1,11 @@
+import fast_textblob
+from compiled_lexicon import build, open_lexicon_file
+
+def test_matches_textblob():
+    assert fast_textblob.check_equivalence() == []
+
+def test_matches_textblob_on_compiled_lexicon(tmp_path):
+    path = str(tmp_path / 'lexicons.bin')
+    build(path)
+    scorer = fast_textblob.FastTextBlob(lexicon=open_lexicon_file(path)['textblob'])
+    assert fast_textblob.check_equivalence(scorer=scorer) == []
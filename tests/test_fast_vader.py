@@ -0,0 +1,12 @@
+import fast_vader
+from compiled_lexicon import build, open_lexicon_file
+
+def test_matches_reference_vader():
+    assert fast_vader.check_equivalence() == []
+
+def test_matches_reference_vader_on_compiled_lexicon(tmp_path):
+    path = str(tmp_path / 'lexicons.bin')
+    build(path)
+    lexicon_file = open_lexicon_file(path)
+    scorer = fast_vader.FastVader(lexicon=lexicon_file['vader'], emojis=lexicon_file['vader_emojis'])
+    assert fast_vader.check_equivalence(scorer=scorer) == []
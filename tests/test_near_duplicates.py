@@ -0,0 +1,89 @@
+import io
+import json
+import random
+
+import cli_sentiment_analysis as cli
+from cli_sentiment_analysis import CLISentimentAnalyzer, run_batch
+from near_duplicates import NearDuplicateIndex
+
+TEMPLATE = "Order {} arrived late and the support team never answered my emails"
+WORDS = "good bad service food slow quick friendly rude price value staff manager".split()
+
+class BacklogProbe:
+    """Counts records read and written to track how many are buffered"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.read = 0
+        self.written = 0
+        self.peak = 0
+
+    def records(self):
+        for i, text in enumerate(self.texts):
+            self.read += 1
+            self.peak = max(self.peak, self.read - self.written)
+            yield i, text
+
+    def append(self, result, record_id):
+        self.written += 1
+
+def _run(monkeypatch, texts, workers, chunksize=16):
+    """Run a batch with near-duplicate detection, counting the texts sent for scoring"""
+    sent = []
+    analyze_many = cli.analyze_many
+
+    def counting_analyze_many(texts, *args, **kwargs):
+        def counted():
+            for text in texts:
+                if text is not cli.FLUSH:
+                    sent.append(text)
+                yield text
+        return analyze_many(counted(), *args, **kwargs)
+
+    monkeypatch.setattr(cli, 'analyze_many', counting_analyze_many)
+    analyzer = CLISentimentAnalyzer(vader_backend='fast', textblob_backend='fast')
+    probe = BacklogProbe(texts)
+    index = NearDuplicateIndex()
+    out = io.StringIO()
+    written = run_batch(analyzer, probe.records(), out, method='vader', workers=workers,
+                        chunksize=chunksize, collector=probe, near_duplicates=index)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert written == len(texts) == len(lines)
+    assert [line['id'] for line in lines] == list(range(len(texts)))
+    return probe, index, sent, lines
+
+def _mixed_corpus(count, seed=3):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        if rng.random() < 0.8:
+            texts.append(TEMPLATE.format(rng.randint(1, 99999)) + f" (form {rng.randint(0, 9)})")
+        else:
+            texts.append(' '.join(rng.choice(WORDS) for _ in range(12)))
+    return texts
+
+def test_duplicate_run_is_not_buffered(monkeypatch):
+    texts = [TEMPLATE.format(1000 + i) for i in range(5000)]
+    probe, index, sent, lines = _run(monkeypatch, texts, workers=1)
+    assert probe.peak <= 2
+    assert len(sent) == 1
+    assert all(line['results']['duplicate']['of'] == 0 for line in lines[1:])
+
+def test_duplicate_run_buffer_is_bounded_with_workers(monkeypatch):
+    texts = [TEMPLATE.format(1000 + i) for i in range(3000)]
+    probe, index, sent, lines = _run(monkeypatch, texts, workers=2)
+    # The records the pool holds: the chunks in flight plus the one being filled
+    assert probe.peak <= 16 * (2 * 2 + 1) + 1
+    assert len(sent) == index.stats()['scored'] == 1
+    assert all('duplicate' in line['results'] for line in lines[1:])
+
+def test_only_representatives_are_scored_with_workers(monkeypatch):
+    texts = _mixed_corpus(3000)
+    expected = None
+    for workers in (1, 2, 4):
+        probe, index, sent, lines = _run(monkeypatch, texts, workers=workers)
+        stats = index.stats()
+        assert len(sent) == stats['scored'] == stats['documents'] - stats['duplicates']
+        assert stats['duplicates'] > 2000
+        expected = expected or lines
+        assert lines == expected
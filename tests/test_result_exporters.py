@@ -0,0 +1,39 @@
+import io
+import json
+
+from result_exporters import FILE_BUFFER_SIZE, CSVExporter, JSONLExporter
+
+RESULTS = {'vader': {'sentiment': 'Positive', 'compound': 0.6}}
+
+class Pipe(io.StringIO):
+    """A stream that records what was flushed, like the read end of a pipe"""
+
+    def __init__(self):
+        super().__init__()
+        self.flushed = ''
+
+    def flush(self):
+        self.flushed = self.getvalue()
+
+def test_streams_get_each_result_right_away():
+    pipe = Pipe()
+    exporter = JSONLExporter(pipe)
+    exporter.write(1, 'Great!', 'vader', RESULTS)
+    assert json.loads(pipe.flushed)['id'] == 1
+    exporter.write(2, 'Great!', 'vader', RESULTS)
+    assert len(pipe.flushed.splitlines()) == 2
+
+def test_csv_header_and_rows_are_streamed():
+    pipe = Pipe()
+    CSVExporter(pipe).write(1, 'Great!', 'vader', RESULTS)
+    assert pipe.flushed.splitlines()[0].startswith('id,text,method')
+    assert len(pipe.flushed.splitlines()) == 2
+
+def test_files_are_written_in_large_batches(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    exporter = JSONLExporter(str(path))
+    assert exporter.buffer_size == FILE_BUFFER_SIZE
+    exporter.write(1, 'Great!', 'vader', RESULTS)
+    assert path.read_text() == ''
+    exporter.close()
+    assert json.loads(path.read_text())['id'] == 1
@@ -0,0 +1,24 @@
+from cli_sentiment_analysis import CLISentimentAnalyzer
+from cascade_scoring import Cascade
+from result_frames import ResultFrameBuilder, summarize
+
+TEXTS = ["I love it!", "It was fine I guess.", "Terrible, never again.", "The box is blue."]
+
+def test_missing_statistics_are_missing_not_zero():
+    analyzer = CLISentimentAnalyzer(vader_backend='fast', extras=())
+    frame = ResultFrameBuilder().extend(analyzer.analyze_text(t, 'vader') for t in TEXTS).to_frame()
+    assert str(frame['total_words'].dtype) == 'Int64'
+    assert frame['total_words'].isna().all()
+    assert frame['sentences'].isna().all()
+    assert frame['cascade_sentiment'].isna().all()
+
+def test_cascade_summary_groups_by_final_label():
+    analyzer = CLISentimentAnalyzer(vader_backend='fast', textblob_backend='fast',
+                                    cascade=Cascade('always'))
+    results = [analyzer.analyze_text(t, 'cascade') for t in TEXTS]
+    frame = ResultFrameBuilder().extend(results).to_frame()
+    assert list(frame['cascade_sentiment']) == [r['cascade']['sentiment'] for r in results]
+    assert list(frame['cascade_tiers']) == [2] * len(TEXTS)
+    summary = summarize(frame, by='cascade_sentiment')
+    assert summary['documents'].sum() == len(TEXTS)
+    assert (summary['cascade_tiers'] == 2).all()
@@ -0,0 +1,20 @@
+from cli_sentiment_analysis import CLISentimentAnalyzer
+from result_records import AnalysisRecord
+
+def test_round_trip_keeps_only_computed_sections():
+    analyzer = CLISentimentAnalyzer(vader_backend='fast', extras=())
+    results = analyzer.analyze_text("Great service, terrible food.", method='vader')
+    assert list(results) == ['vader']
+    assert AnalysisRecord.from_dict(results).to_dict() == results
+
+def test_round_trip_of_cascade_result():
+    analyzer = CLISentimentAnalyzer(vader_backend='fast', textblob_backend='fast', extras=('emotions',))
+    results = analyzer.analyze_text("It was okay.", method='cascade')
+    record = AnalysisRecord.from_dict(results)
+    assert record.to_dict() == results
+    assert list(record.to_dict()) == list(results)
+
+def test_round_trip_of_full_result():
+    analyzer = CLISentimentAnalyzer()
+    results = analyzer.analyze_text("I love it! But the battery is awful.", method='both')
+    assert AnalysisRecord.from_dict(results).to_dict() == results
@@ -0,0 +1,24 @@
+import matplotlib
+matplotlib.use('Agg')
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from sentiment_charts import SentimentCharts
+
+def _charts():
+    figure = Figure(figsize=(6, 4))
+    return SentimentCharts(figure, FigureCanvasAgg(figure))
+
+def test_emotion_scale_follows_the_current_result():
+    charts = _charts()
+    charts.update({'Emotions': {'joy': 2400}})
+    assert charts.emotion_ax.get_ylim() == (0, 5000)
+    charts.update({'Emotions': {'joy': 2}})
+    assert charts.emotion_ax.get_ylim() == (0, 2)
+
+def test_clear_resets_the_emotion_scale():
+    charts = _charts()
+    charts.update({'Emotions': {'joy': 2400}})
+    charts.clear()
+    assert charts.emotion_ax.get_ylim() == (0, 1)
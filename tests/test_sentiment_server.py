@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from sentiment_server import MAX_BODY_BYTES, HTTPError, SentimentServer
+
+def _read(raw):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await SentimentServer()._read_request(reader)
+    return asyncio.run(read())
+
+def _request(length):
+    return b"POST /analyze HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"
+
+def test_reads_body():
+    assert _read(_request(b'2')) == ('POST', '/analyze', {'content-length': '2'}, b'{}')
+
+@pytest.mark.parametrize('length, status', [
+    (b'abc', 400),
+    (b'-5', 400),
+    (str(MAX_BODY_BYTES + 1).encode(), 413)
+])
+def test_rejects_bad_content_length(length, status):
+    with pytest.raises(HTTPError) as error:
+        _read(_request(length))
+    assert error.value.status == status
+
+def test_keeps_files_that_are_not_sockets(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('keep me')
+    server = SentimentServer(port=None, unix_socket=str(path), workers=1)
+    with pytest.raises(OSError):
+        asyncio.run(server.start())
+    assert path.read_text() == 'keep me'
+    assert server.analyzer is None
+
+@pytest.mark.parametrize('request_body', [
+    {'text': 'Great!', 'by_sentence': 'false'},
+    {'text': 'Great!', 'by_sentence': 1},
+    {'texts': ['Great!'], 'by_sentence': None},
+    {'text': 'Great!', 'method': 'cascade', 'by_sentence': True}
+])
+def test_rejects_invalid_by_sentence(request_body):
+    path = '/analyze_batch' if 'texts' in request_body else '/analyze'
+    body = json.dumps(request_body).encode('utf-8')
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(SentimentServer()._dispatch('POST', path, body))
+    assert error.value.status == 400
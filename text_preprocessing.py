@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Text Preprocessing
+Shared preprocessing stage: each text is split into sentences and tokenized
+once, and the same sentences and token stream feed the text statistics
+and sentence-level scoring. (Emotion analysis splits words the way its
+lexicon terms are split; see emotion_lexicon.tokenize_words.)
+"""
+
+from functools import lru_cache
+
+# (resource path, download package) pairs needed by the analysis pipeline.
+# Newer NLTK releases tokenize with punkt_tab, older ones with punkt.
+NLTK_RESOURCES = [
+    ('tokenizers/punkt', 'punkt'),
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords')
+]
+
+SETUP_HINT = "run 'python cli_sentiment_analysis.py setup' to download it"
+
+def missing_nltk_data():
+    """Return the NLTK packages that are not installed locally (never touches the network)"""
+    import nltk
+    missing = []
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+def download_nltk_data(packages=None, quiet=False):
+    """Download NLTK packages (default: all required ones), returning those that failed"""
+    import nltk
+    if packages is None:
+        packages = [package for _, package in NLTK_RESOURCES]
+    return [package for package in packages if not nltk.download(package, quiet=quiet)]
+
+def word_tokenize(text, preserve_line=False):
+    """NLTK word tokenization, imported on first use"""
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    try:
+        return nltk_word_tokenize(text, preserve_line=preserve_line)
+    except LookupError as e:
+        raise LookupError(f"NLTK tokenizer data is missing; {SETUP_HINT}") from e
+
+def split_sentences(text):
+    """NLTK (punkt) sentence splitting, imported on first use"""
+    from nltk.tokenize import sent_tokenize
+    try:
+        return sent_tokenize(text)
+    except LookupError as e:
+        raise LookupError(f"NLTK tokenizer data is missing; {SETUP_HINT}") from e
+
+@lru_cache(maxsize=None)
+def get_stopwords(language='english'):
+    """Return the NLTK stopword set for a language, loaded once per process"""
+    from nltk.corpus import stopwords
+    try:
+        return frozenset(stopwords.words(language))
+    except LookupError as e:
+        raise LookupError(f"NLTK stopwords are missing; {SETUP_HINT}") from e
+
+class PreparedText:
+    """A text with its sentences, per-sentence lowercase tokens and all tokens"""
+
+    __slots__ = ('text', 'sentences', 'sentence_tokens', 'tokens')
+
+    def __init__(self, text, sentences, sentence_tokens):
+        self.text = text
+        self.sentences = sentences
+        self.sentence_tokens = sentence_tokens
+        self.tokens = [token for tokens in sentence_tokens for token in tokens]
+
+def prepare_text(text):
+    """Split a text into sentences and tokenize it once for all analysis stages"""
+    # Same tokens as word_tokenize(), which sentence-splits internally anyway
+    sentences = split_sentences(text)
+    sentence_tokens = [word_tokenize(sentence.lower(), preserve_line=True) for sentence in sentences]
+    return PreparedText(text, sentences, sentence_tokens)
+
+def text_statistics(text, tokens=None, language='english', sentences=None):
+    """Get basic text statistics, reusing ``tokens`` and ``sentences`` when already available"""
+    if tokens is None or sentences is None:
+        prepared = prepare_text(text)
+        tokens, sentences = prepared.tokens, prepared.sentences
+    stop_words = get_stopwords(language)
+
+    # Filter out stop words and punctuation
+    filtered_words = [word for word in tokens if word.isalnum() and word not in stop_words]
+
+    return {
+        "total_words": len(tokens),
+        "filtered_words": len(filtered_words),
+        "sentences": len(sentences),
+        "avg_word_length": sum(len(word) for word in filtered_words) / len(filtered_words) if filtered_words else 0
+    }